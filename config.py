@@ -4,41 +4,63 @@
 """
 import os
 from dataclasses import dataclass, field
-from typing import List
+from typing import Tuple
 
+# 환경변수 스냅샷 (import 시 1회만 읽음)
+_ENV = dict(os.environ)
+_env = _ENV.get
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """정후 트래커 설정 클래스"""
+    """
+    정후 트래커 설정 클래스
+    
+    불변(frozen) 객체이며, 파생 값(URL, 토픽, 클래스 목록)은 생성 시 한 번만 계산합니다.
+    """
     
     # --- 카메라 설정 ---
-    TAPO_IP: str = field(default_factory=lambda: os.getenv('TAPO_IP', ''))
-    TAPO_USER: str = field(default_factory=lambda: os.getenv('TAPO_USER', ''))
-    TAPO_PASSWORD: str = field(default_factory=lambda: os.getenv('TAPO_PASSWORD', ''))
+    TAPO_IP: str = _env('TAPO_IP', '')
+    TAPO_USER: str = _env('TAPO_USER', '')
+    TAPO_PASSWORD: str = _env('TAPO_PASSWORD', '')
     TAPO_ONVIF_PORT: int = 2020
     
     # --- MQTT 설정 ---
-    MQTT_BROKER_IP: str = field(default_factory=lambda: os.getenv('MQTT_BROKER_IP', '127.0.0.1'))
+    MQTT_BROKER_IP: str = _env('MQTT_BROKER_IP', '127.0.0.1')
     MQTT_PORT: int = 1883
     MQTT_KEEPALIVE: int = 60
     
     # --- Frigate/스트림 설정 ---
-    FRIGATE_CAMERA_NAME: str = field(default_factory=lambda: os.getenv('FRIGATE_CAMERA_NAME', 'livingroom'))
-    GO2RTC_STREAM_NAME: str = field(default_factory=lambda: os.getenv('GO2RTC_STREAM_NAME', 'livingroom'))
+    FRIGATE_CAMERA_NAME: str = _env('FRIGATE_CAMERA_NAME', 'livingroom')
+    GO2RTC_STREAM_NAME: str = _env('GO2RTC_STREAM_NAME', 'livingroom')
     
     # --- 모델 설정 ---
-    MODEL_PATH: str = 'yolo26n_jeonghoo_openvino_model'
+    MODEL_PATH: str = 'yolo26n_jeonghoo_openvino_model'  # FP32 모델 (INT8 미사용/부재 시)
+    # INT8 양자화 모델 (생성: yolo export model=<가중치> format=openvino int8=True data=<데이터셋 yaml>)
+    MODEL_INT8_PATH: str = 'yolo26n_jeonghoo_int8_openvino_model'
+    MODEL_USE_INT8: bool = False  # INT8 모델 사용 (이미지에 포함되지 않으므로 직접 생성 후 활성화)
     MODEL_CONFIDENCE: float = 0.5
     MODEL_IMGSZ: int = 640  # 추론 해상도 (작을수록 빠름)
+    MODEL_WARMUP_RUNS: int = 2  # 시작 시 더미 추론 횟수 (첫 추론 지연 제거)
+    
+    # ROI 추론 (정후 추적 중 마지막 위치 주변만 잘라 작은 해상도로 추론)
+    # 작은 imgsz가 적용되려면 모델을 dynamic=True로 export해야 함
+    ROI_INFERENCE: bool = False
+    ROI_IMGSZ: int = 320  # ROI 추론 해상도
+    ROI_SIZE_RATIO: float = 0.5  # 프레임 대비 ROI 크기 비율
+    ROI_FULL_FRAME_INTERVAL: int = 10  # 연속 ROI 추론 N회마다 전체 프레임 추론
     
     # --- 성능 설정 ---
     TARGET_FPS: int = 10  # 초당 처리 프레임 제한
+    RTSP_HW_ACCEL: bool = True  # RTSP 하드웨어 디코딩 시도 (미지원 시 CPU 디코딩)
+    FRAME_WAIT_TIMEOUT: float = 1.0  # 새 프레임 대기 최대 시간 (초)
+    ASYNC_INFERENCE: bool = False  # 추론을 별도 스레드에서 1프레임 앞서 실행 (지연 1프레임 증가)
     STARTUP_IGNORE_TIME: float = 10.0  # 시작 후 MQTT 무시 시간
     
     # --- 수색 모드 설정 ---
     AUDIO_TRIGGER_TIME: int = 300  # 소리 감지 후 수색 시간 (5분)
     SCAN_INTERVAL: int = 30  # 프리셋 이동 간격 (30초)
-    SEARCH_PRESETS: List[str] = field(default_factory=lambda: ["1", "2", "4"])
+    SEARCH_PRESETS: Tuple[str, ...] = ("1", "2", "4")
     
     # --- 추적 알고리즘 파라미터 ---
     PAN_DEAD_ZONE: float = 0.1  # 수평 중심 허용 오차
@@ -51,7 +73,7 @@ class Config:
     
     # Fallback 안전장치
     TRACKING_PATIENCE_COUNT: int = 10  # 타겟 놓침 유예 프레임 수 (약 1초)
-    FALLBACK_CLASSES: List[int] = field(default_factory=lambda: [0, 2])  # 대체 추적 클래스 (0:아빠, 2:엄마)
+    FALLBACK_CLASSES: Tuple[int, ...] = (0, 2)  # 대체 추적 클래스 (0:아빠, 2:엄마)
     MAX_FALLBACK_DISTANCE: float = 0.3  # 대체 추적 허용 반경 (화면 너비 비율)
     MAX_FALLBACK_DURATION: float = 5.0  # 대체 추적 최대 허용 시간 (초)
     
@@ -60,17 +82,28 @@ class Config:
     DISTANCE_WEIGHT: float = 0.4  # 중심 거리 가중치
     
     # --- 디버그 설정 ---
-    DEBUG_DIR: str = field(default_factory=lambda: os.getenv('DEBUG_DIR', '/app/debug'))
+    DEBUG_DIR: str = _env('DEBUG_DIR', '/app/debug')
     SAVE_DEBUG_IMAGES: bool = True
     DEBUG_SAVE_INTERVAL: float = 2.0  # 디버그 이미지 저장 간격
     DEBUG_MAX_FILES: int = 1000  # 최대 디버그 이미지 파일 수
+    DEBUG_JPEG_QUALITY: int = 80  # 디버그 이미지 JPEG 품질
+    DEBUG_WRITE_QUEUE_SIZE: int = 4  # 저장 대기 큐 크기 (초과 시 오래된 것부터 버림)
     
     # --- PTZ 설정 ---
-    PTZ_RECONNECT_DELAY: float = 3.0  # 연결 실패 시 재시도 대기
-    PTZ_LOOP_INTERVAL: float = 0.1  # PTZ 명령 전송 주기
-    PTZ_VELOCITY_THRESHOLD: float = 0.01  # 속도 변경 감지 임계값
+    PTZ_RECONNECT_BASE: float = 1.0  # 연결 실패 시 첫 재시도 대기 (실패마다 2배)
+    PTZ_RECONNECT_MAX: float = 300.0  # 재시도 대기 상한 (초)
+    PTZ_RECONNECT_LOG_EVERY: int = 10  # 연속 실패 중 N회마다 로그 출력
+    PTZ_RECONNECT_SETTLE: float = 0.2  # 재연결 직후 첫 명령 전송 전 대기 (초)
+    PTZ_CONNECT_TIMEOUT: float = 3.0  # ONVIF 요청 TCP 연결 타임아웃 (초)
+    PTZ_READ_TIMEOUT: float = 5.0  # ONVIF 요청 응답 대기 타임아웃 (초, 초과 시 재연결)
+    PTZ_KEEPALIVE_INTERVAL: float = 1.0  # 이동 중 연속 이동 명령 재전송 주기 (카메라 자동 정지 방지)
+    PTZ_VELOCITY_QUANTUM: float = 0.1  # PTZ 속도 양자화 단위 (이 단위 미만의 변화는 전송 안 함)
+    PTZ_RAW_SOAP: bool = True  # 연속 이동 명령을 zeep 없이 직접 전송 (카메라 거부 시 자동으로 zeep 사용)
+    PTZ_STATE_PUBLISH: bool = False  # PTZ 속도가 바뀔 때 MQTT로 게시 (Home Assistant 등)
+    PTZ_STATE_MIN_INTERVAL: float = 0.5  # PTZ 상태 게시 최소 간격 (그 사이 변경은 마지막 값으로 합침)
     
     # --- 로그 설정 ---
+    LOG_LEVEL: str = _env('LOG_LEVEL', 'INFO')  # DEBUG로 설정 시 프레임 단위 상세 로그 출력
     STATUS_LOG_INTERVAL: float = 10.0  # 상태 로그 출력 간격
     SEARCH_LOG_INTERVAL: float = 5.0  # 수색 중 로그 간격
     
@@ -78,23 +111,42 @@ class Config:
     SLEEP_CHECK_INTERVAL: float = 1.0  # 슬립 모드 중 체크 간격 (초)
     PRIVACY_BRIGHTNESS_THRESHOLD: int = 30  # 프라이버시 모드 밝기 임계값
     PRIVACY_STD_THRESHOLD: int = 40  # 프라이버시 모드 표준편차 임계값
+    ANALYZE_STRIDE: int = 8  # 밝기 분석 시 픽셀 샘플링 간격 (가로/세로 1/8)
     SLEEP_WAKE_CHECK_COUNT: int = 3  # 연속 N회 정상 화면이면 복귀
     
     # --- 대기 모드 설정 (사람 없음) ---
     IDLE_CHECK_INTERVAL: float = 1.0  # 대기 모드 중 체크 간격 (초)
     PERSON_TIMEOUT: float = 30.0  # person MQTT 미수신 시 타임아웃 (초)
     
-    def get_rtsp_url(self) -> str:
-        """RTSP 스트림 URL 생성"""
-        return f"rtsp://{self.MQTT_BROKER_IP}:8554/{self.GO2RTC_STREAM_NAME}"
-    
-    def get_mqtt_audio_topic(self) -> str:
-        """MQTT 오디오 토픽 패턴 생성"""
-        return f"frigate/{self.FRIGATE_CAMERA_NAME}/audio/+"
-    
-    def get_mqtt_person_topic(self) -> str:
-        """MQTT person 토픽 생성"""
-        return f"frigate/{self.FRIGATE_CAMERA_NAME}/person"
+    # --- 파생 값 (__post_init__에서 계산) ---
+    RTSP_URL: str = field(init=False, default='')  # RTSP 스트림 URL
+    MQTT_AUDIO_TOPIC: str = field(init=False, default='')  # MQTT 오디오 토픽 패턴
+    MQTT_PERSON_TOPIC: str = field(init=False, default='')  # MQTT person 토픽
+    MQTT_PTZ_STATE_TOPIC: str = field(init=False, default='')  # PTZ 상태 게시 토픽
+    DETECT_CLASSES: Tuple[int, ...] = field(init=False, default=())  # 추론 대상 클래스 (정후 + 대체)
+    MAX_FALLBACK_DISTANCE_SQ: float = field(init=False, default=0.0)  # 대체 추적 허용 반경의 제곱
+    
+    def __post_init__(self) -> None:
+        """파생 값 계산 (frozen이므로 object.__setattr__ 사용)"""
+        object.__setattr__(
+            self, 'RTSP_URL', f"rtsp://{self.MQTT_BROKER_IP}:8554/{self.GO2RTC_STREAM_NAME}"
+        )
+        object.__setattr__(
+            self, 'MQTT_AUDIO_TOPIC', f"frigate/{self.FRIGATE_CAMERA_NAME}/audio/+"
+        )
+        object.__setattr__(
+            self, 'MQTT_PERSON_TOPIC', f"frigate/{self.FRIGATE_CAMERA_NAME}/person"
+        )
+        object.__setattr__(
+            self, 'MQTT_PTZ_STATE_TOPIC', f"jeonghoo/{self.FRIGATE_CAMERA_NAME}/ptz"
+        )
+        object.__setattr__(
+            self, 'DETECT_CLASSES',
+            tuple(dict.fromkeys((1,) + tuple(self.FALLBACK_CLASSES)))
+        )
+        object.__setattr__(
+            self, 'MAX_FALLBACK_DISTANCE_SQ', self.MAX_FALLBACK_DISTANCE ** 2
+        )
     
     def validate(self) -> bool:
         """필수 설정값 검증"""
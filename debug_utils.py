@@ -1,24 +1,30 @@
 """
 디버그 유틸리티 모듈
 디버그 이미지 저장 및 관리 기능
+
+cv2/glob 등 무거운 모듈은 디버그 저장이 켜져 있을 때만 로드합니다.
 """
+from __future__ import annotations
+
 import os
-import cv2
-import glob
-from datetime import datetime
-from typing import Optional, List, Tuple
-import numpy as np
+import time
+import queue
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
 
 from config import config
 from state import TrackerState
 from utils import log
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class DebugImageManager:
     """
     디버그 이미지 저장 및 관리 클래스
     
-    - 상태바가 포함된 디버그 이미지 저장
+    - 상태바가 포함된 디버그 이미지 저장 (주석 그리기/JPEG 인코딩은 백그라운드 스레드)
     - 오래된 이미지 자동 정리
     """
     
@@ -31,13 +37,46 @@ class DebugImageManager:
         'special': (0, 0, 255),       # 빨강
     }
     
+    CROSSHAIR_COLOR = (0, 255, 0)  # 십자선 색상 (BGR)
+    STATUS_BAR_HEIGHT = 20  # 상단 상태바 높이 (px)
+    
     def __init__(self, debug_dir: Optional[str] = None):
         """
         Args:
             debug_dir: 디버그 이미지 저장 디렉토리 (None이면 config 사용)
         """
         self.debug_dir = debug_dir or config.DEBUG_DIR
+        self.enabled = config.SAVE_DEBUG_IMAGES
+        self._counter = 0  # 파일명 중복 방지용 일련번호
+        self._writer_thread: Optional[threading.Thread] = None
+        
+        if self.enabled:
+            self._start()
+    
+    def _start(self) -> None:
+        """모듈 로드 및 저장 스레드 시작 (디버그 저장 활성 시에만)"""
+        import cv2
+        import glob
+        import numpy
+        self._cv2 = cv2
+        self._glob = glob
+        self._np = numpy
+        
+        # 상태 접두어가 미리 그려진 상태바 템플릿 캐시 (저장 스레드만 접근)
+        # {(접두어, 배경색, 프레임 너비): (상태바 이미지, 가변 텍스트 x 오프셋)}
+        self._status_bar_cache: Dict[Tuple[str, Tuple[int, int, int], int], Tuple[np.ndarray, int]] = {}
+        
         self._ensure_dir()
+        
+        # 파일 수를 메모리에서 추적하여 한도 초과 시에만 디렉토리 스캔
+        # (저장 스레드만 접근)
+        self._file_count = self._count_files()
+        
+        # JPEG 인코딩/디스크 쓰기는 백그라운드 스레드에서 처리
+        self._encode_params = [cv2.IMWRITE_JPEG_QUALITY, config.DEBUG_JPEG_QUALITY]
+        self._write_queue: queue.Queue = queue.Queue(maxsize=config.DEBUG_WRITE_QUEUE_SIZE)
+        self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer_thread.start()
     
     def _ensure_dir(self) -> None:
         """디버그 디렉토리 생성"""
@@ -46,15 +85,20 @@ class DebugImageManager:
         except Exception as e:
             log(f"⚠️ 디버그 디렉토리 생성 실패: {e}")
     
+    def _count_files(self) -> int:
+        """디버그 디렉토리의 이미지 파일 수"""
+        return len(self._glob.glob(os.path.join(self.debug_dir, "*.jpg")))
+    
     def save_debug_image(
         self,
         frame: np.ndarray,
         state: TrackerState,
-        box: Optional[List[float]] = None,
+        box: Optional[Sequence[float]] = None,
         conf: float = 0.0,
         pan: float = 0.0,
         tilt: float = 0.0,
-        status_override: Optional[str] = None
+        status_override: Optional[str] = None,
+        now: Optional[float] = None
     ) -> bool:
         """
         디버그 이미지 저장
@@ -67,45 +111,33 @@ class DebugImageManager:
             pan: 현재 팬 속도
             tilt: 현재 틸트 속도
             status_override: 상태 텍스트 오버라이드
+            now: 현재 시각 (호출자가 틱마다 한 번 읽은 값, None이면 직접 읽음)
             
         Returns:
             저장 성공 여부
         """
-        if not config.SAVE_DEBUG_IMAGES:
+        if not self.enabled:
             return False
         
-        if not state.can_save_debug(config.DEBUG_SAVE_INTERVAL):
+        if now is None:
+            now = time.monotonic()
+        
+        if not state.can_save_debug(config.DEBUG_SAVE_INTERVAL, now):
             return False
         
         try:
-            annotated = frame.copy()
-            h, w = annotated.shape[:2]
-            cx, cy = w // 2, h // 2
-            
-            # 십자선 그리기
-            self._draw_crosshair(annotated, cx, cy, h, w)
-            
-            # 감지 박스 그리기
-            if box:
-                self._draw_detection_box(annotated, box, conf)
-            
-            # 상태 텍스트 및 배경색 결정
+            # 상태 텍스트 및 배경색 결정 (상태 객체는 호출 스레드에서만 읽음)
             info_text, bg_color = self._get_status_info(
-                state, pan, tilt, status_override
+                state, pan, tilt, status_override, now
             )
             
-            # 상단 상태바 그리기
-            self._draw_status_bar(annotated, info_text, bg_color, w)
-            
-            # 파일 저장
+            # 프레임 버퍼는 리더가 재사용하므로 복사만 하고,
+            # 주석 그리기/인코딩/파일 쓰기는 저장 스레드로 전달
             filename = self._generate_filename()
-            cv2.imwrite(filename, annotated)
+            self._enqueue_write((filename, frame.copy(), box, conf, info_text, bg_color))
             
             log(f"📸 사진 저장: {info_text}")
-            state.mark_debug_saved()
-            
-            # 오래된 파일 정리
-            self._cleanup_old_files()
+            state.mark_debug_saved(now)
             
             return True
             
@@ -113,6 +145,76 @@ class DebugImageManager:
             log(f"⚠️ 디버그 이미지 저장 실패: {e}")
             return False
     
+    def _enqueue_write(self, item: tuple) -> None:
+        """저장 큐에 추가 (가득 차면 가장 오래된 항목을 버림)"""
+        while True:
+            try:
+                self._write_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._write_queue.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def _write_loop(self) -> None:
+        """주석 그리기, JPEG 인코딩 및 파일 쓰기 루프 (백그라운드 스레드)"""
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            
+            filename, image, box, conf, info_text, bg_color = item
+            try:
+                self._annotate(image, box, conf, info_text, bg_color)
+                
+                ok, buf = self._cv2.imencode('.jpg', image, self._encode_params)
+                if not ok:
+                    log(f"⚠️ 디버그 이미지 인코딩 실패: {filename}")
+                    continue
+                
+                with open(filename, 'wb') as f:
+                    f.write(buf)
+                
+                # 한도 초과 시에만 오래된 파일 정리
+                self._file_count += 1
+                if self._file_count > config.DEBUG_MAX_FILES:
+                    self._cleanup_old_files()
+                    
+            except Exception as e:
+                log(f"⚠️ 디버그 이미지 쓰기 실패: {e}")
+    
+    def shutdown(self) -> None:
+        """저장 스레드 종료 (대기 중인 이미지는 최대한 기록)"""
+        if self._writer_thread is None:
+            return
+        try:
+            self._write_queue.put(None, timeout=1.0)
+        except queue.Full:
+            return
+        self._writer_thread.join(timeout=2.0)
+    
+    def _annotate(
+        self,
+        image: np.ndarray,
+        box: Optional[Sequence[float]],
+        conf: float,
+        info_text: str,
+        bg_color: Tuple[int, int, int]
+    ) -> None:
+        """십자선, 감지 박스, 상단 상태바 그리기 (저장 스레드)"""
+        h, w = image.shape[:2]
+        
+        # 십자선 그리기
+        self._draw_crosshair(image, w // 2, h // 2, h, w)
+        
+        # 감지 박스 그리기
+        if box is not None:
+            self._draw_detection_box(image, box, conf)
+        
+        # 상단 상태바 그리기
+        self._draw_status_bar(image, info_text, bg_color, w)
+    
     def _draw_crosshair(
         self,
         frame: np.ndarray,
@@ -121,17 +223,18 @@ class DebugImageManager:
         h: int,
         w: int
     ) -> None:
-        """십자선 그리기"""
-        cv2.line(frame, (cx, 0), (cx, h), (0, 255, 0), 1)
-        cv2.line(frame, (0, cy), (w, cy), (0, 255, 0), 1)
+        """십자선 그리기 (1px 축 정렬 선이므로 cv2.line 대신 슬라이스 대입)"""
+        frame[:, cx] = self.CROSSHAIR_COLOR
+        frame[cy, :] = self.CROSSHAIR_COLOR
     
     def _draw_detection_box(
         self,
         frame: np.ndarray,
-        box: List[float],
+        box: Sequence[float],
         conf: float
     ) -> None:
         """감지 박스 및 라벨 그리기"""
+        cv2 = self._cv2
         x1, y1, x2, y2 = map(int, box)
         cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 255), 2)
         
@@ -146,7 +249,8 @@ class DebugImageManager:
         state: TrackerState,
         pan: float,
         tilt: float,
-        status_override: Optional[str]
+        status_override: Optional[str],
+        now: float
     ) -> Tuple[str, Tuple[int, int, int]]:
         """상태 텍스트 및 배경색 결정"""
         if status_override:
@@ -159,7 +263,7 @@ class DebugImageManager:
         if state.is_searching:
             preset_idx = state.current_preset_idx % len(config.SEARCH_PRESETS)
             preset = config.SEARCH_PRESETS[preset_idx]
-            remain = state.get_search_remaining_time(config.AUDIO_TRIGGER_TIME)
+            remain = state.get_search_remaining_time(config.AUDIO_TRIGGER_TIME, now)
             info_text = f"[SEARCHING] Preset {preset} ({remain}s left)"
             return info_text, self.STATUS_COLORS['searching']
         
@@ -172,23 +276,72 @@ class DebugImageManager:
         bg_color: Tuple[int, int, int],
         width: int
     ) -> None:
-        """상단 상태바 그리기"""
-        cv2.rectangle(frame, (int(width / 2), 0), (width, 20), bg_color, -1)
-        cv2.putText(
-            frame, text, (int(width / 2) + 5, 15),
-            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2
+        """
+        상단 상태바 그리기
+        
+        고정 접두어("[TRACKING]" 등)는 캐시된 템플릿을 복사하고,
+        뒤의 가변 텍스트만 매번 putText로 그립니다.
+        """
+        prefix, tail = self._split_status_text(text)
+        bar, tail_x = self._get_status_bar(prefix, bg_color, width)
+        
+        x0 = width // 2
+        frame[0:bar.shape[0], x0:width] = bar
+        if tail:
+            self._cv2.putText(
+                frame, tail, (x0 + tail_x, 15),
+                self._cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2
+            )
+    
+    @staticmethod
+    def _split_status_text(text: str) -> Tuple[str, str]:
+        """상태 텍스트를 고정 접두어("[...]")와 가변 텍스트로 분리"""
+        if text.startswith('['):
+            end = text.find('] ')
+            if end >= 0:
+                return text[:end + 1], text[end + 2:]
+        return '', text
+    
+    def _get_status_bar(
+        self,
+        prefix: str,
+        bg_color: Tuple[int, int, int],
+        width: int
+    ) -> Tuple[np.ndarray, int]:
+        """접두어가 그려진 상태바 템플릿 반환 (최초 1회만 렌더링)"""
+        key = (prefix, bg_color, width)
+        cached = self._status_bar_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        cv2 = self._cv2
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        bar = self._np.empty(
+            (self.STATUS_BAR_HEIGHT + 1, width - width // 2, 3), dtype=self._np.uint8
         )
+        bar[:] = bg_color
+        
+        tail_x = 5
+        if prefix:
+            cv2.putText(bar, prefix, (5, 15), font, 0.5, (255, 255, 255), 2)
+            (text_w, _), _ = cv2.getTextSize(prefix + ' ', font, 0.5, 2)
+            tail_x += text_w
+        
+        cached = (bar, tail_x)
+        self._status_bar_cache[key] = cached
+        return cached
     
     def _generate_filename(self) -> str:
-        """디버그 이미지 파일명 생성"""
-        timestamp = datetime.now().strftime('%H%M%S_%f')[:10]  # 마이크로초 일부 포함
-        return os.path.join(self.debug_dir, f"{timestamp}.jpg")
+        """디버그 이미지 파일명 생성 (나노초 타임스탬프 + 일련번호, 이름순 = 시간순)"""
+        self._counter += 1
+        return os.path.join(self.debug_dir, f"{time.time_ns()}_{self._counter}.jpg")
     
     def _cleanup_old_files(self) -> None:
-        """오래된 디버그 이미지 정리"""
+        """오래된 디버그 이미지 정리 (저장 스레드)"""
+        removed = 0
         try:
             pattern = os.path.join(self.debug_dir, "*.jpg")
-            files = sorted(glob.glob(pattern))
+            files = sorted(self._glob.glob(pattern))
             
             # 최대 파일 수 초과 시 오래된 것부터 삭제
             excess_count = len(files) - config.DEBUG_MAX_FILES
@@ -196,11 +349,15 @@ class DebugImageManager:
                 for f in files[:excess_count]:
                     try:
                         os.remove(f)
+                        removed += 1
                     except Exception:
                         pass
                         
         except Exception as e:
             log(f"⚠️ 디버그 파일 정리 실패: {e}")
+        
+        finally:
+            self._file_count -= removed
 
 
 # 전역 디버그 매니저 인스턴스
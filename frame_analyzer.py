@@ -4,11 +4,23 @@
 """
 import cv2
 import numpy as np
+from dataclasses import dataclass
 from typing import Tuple
 
 from config import config
 
 
+@dataclass(frozen=True, slots=True)
+class FrameStats:
+    """프레임 분석 결과 (한 번 계산한 밝기 통계에서 모든 판정을 도출)"""
+    
+    mean: float  # 평균 밝기
+    std: float  # 밝기 표준편차
+    is_privacy: bool  # 프라이버시 모드 화면 여부
+    is_connection_lost: bool  # 연결 끊김 화면 여부
+    is_normal: bool  # 정상 프레임 여부
+
+
 class FrameAnalyzer:
     """
     프레임 분석 클래스
@@ -21,21 +33,26 @@ class FrameAnalyzer:
         """
         프레임의 밝기 통계 계산
         
+        밝기 통계는 해상도에 거의 무관하므로 ANALYZE_STRIDE 간격으로 샘플링한
+        뷰에서 계산합니다. (리사이즈와 달리 건너뛴 행은 메모리에서 읽지 않음)
+        이미 축소된 프레임/뷰를 넘겨도 같은 임계값으로 판정할 수 있습니다.
+        
         Args:
-            frame: BGR 프레임
+            frame: BGR 프레임 (축소본 또는 슬라이스 뷰 가능)
             
         Returns:
             (평균 밝기, 표준편차) 튜플
         """
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        mean_brightness = float(np.mean(gray))
-        std_brightness = float(np.std(gray))
-        return mean_brightness, std_brightness
+        stride = config.ANALYZE_STRIDE
+        small = np.ascontiguousarray(frame[::stride, ::stride])  # 샘플 픽셀만 복사
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        mean, std = cv2.meanStdDev(gray)  # 한 번의 순회로 평균/표준편차 계산
+        return float(mean[0, 0]), float(std[0, 0])
     
     @staticmethod
-    def is_privacy_mode(frame: np.ndarray) -> bool:
+    def analyze(frame: np.ndarray) -> FrameStats:
         """
-        프라이버시 모드 화면 감지
+        프레임 상태 분석 (밝기 통계 1회 계산)
         
         Tapo C210 프라이버시 모드 특성:
         - 거의 검은 화면 (평균 밝기 매우 낮음)
@@ -45,14 +62,35 @@ class FrameAnalyzer:
             frame: BGR 프레임
             
         Returns:
-            프라이버시 모드 여부
+            FrameStats 분석 결과
         """
         mean_brightness, std_brightness = FrameAnalyzer.get_brightness_stats(frame)
         
         is_dark = mean_brightness < config.PRIVACY_BRIGHTNESS_THRESHOLD
         is_uniform = std_brightness < config.PRIVACY_STD_THRESHOLD
         
-        return is_dark and is_uniform
+        return FrameStats(
+            mean=mean_brightness,
+            std=std_brightness,
+            is_privacy=is_dark and is_uniform,
+            # 완전히 검은 화면 (분산도 거의 0)
+            is_connection_lost=mean_brightness < 5 and std_brightness < 5,
+            # 어느 정도 밝기가 있으면 정상
+            is_normal=not is_dark,
+        )
+    
+    @staticmethod
+    def is_privacy_mode(frame: np.ndarray) -> bool:
+        """
+        프라이버시 모드 화면 감지
+        
+        Args:
+            frame: BGR 프레임
+            
+        Returns:
+            프라이버시 모드 여부
+        """
+        return FrameAnalyzer.analyze(frame).is_privacy
     
     @staticmethod
     def is_connection_lost(frame: np.ndarray) -> bool:
@@ -65,10 +103,7 @@ class FrameAnalyzer:
         Returns:
             연결 끊김 여부
         """
-        mean_brightness, std_brightness = FrameAnalyzer.get_brightness_stats(frame)
-        
-        # 완전히 검은 화면 (분산도 거의 0)
-        return mean_brightness < 5 and std_brightness < 5
+        return FrameAnalyzer.analyze(frame).is_connection_lost
     
     @staticmethod
     def is_normal_frame(frame: np.ndarray) -> bool:
@@ -81,7 +116,4 @@ class FrameAnalyzer:
         Returns:
             정상 프레임 여부
         """
-        mean_brightness, _ = FrameAnalyzer.get_brightness_stats(frame)
-        
-        # 어느 정도 밝기가 있으면 정상
-        return mean_brightness >= config.PRIVACY_BRIGHTNESS_THRESHOLD
+        return FrameAnalyzer.analyze(frame).is_normal
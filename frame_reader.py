@@ -2,37 +2,61 @@
 프레임 리더 모듈
 RTSP 스트림에서 최신 프레임을 읽는 스레드 기반 리더
 """
+import os
 import cv2
 import time
 import threading
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import numpy as np
 
-from utils import log
+from utils import log, log_warning
+
+# FFmpeg 캡처 옵션 (환경변수로 재정의 가능)
+# RTSP를 TCP로 받아 패킷 손실로 인한 디코딩 오류/재전송을 방지
+os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', 'rtsp_transport;tcp')
 
 
 class LatestFrameReader:
     """
     RTSP 스트림에서 항상 최신 프레임만 유지하는 스레드 기반 리더
     
+    3개의 프레임 버퍼를 돌려 쓰는 트리플 버퍼링으로 read() 시 복사를 피합니다.
+    쓰기 스레드는 최신 버퍼와 소비자가 읽고 있는 버퍼를 제외한 버퍼에만 씁니다.
+    
+    쓰기 스레드 1개 / 소비자 1개 구조이므로 락 없이 동작합니다.
+    (CPython에서 속성 대입은 원자적이며, 시퀀스 번호로 경합을 감지)
+    
     컨텍스트 매니저 지원:
         with LatestFrameReader(url) as reader:
             ret, frame = reader.read()
     """
     
-    def __init__(self, src: str, buffer_size: int = 1):
+    def __init__(
+        self,
+        src: str,
+        buffer_size: int = 1,
+        target_fps: Optional[float] = None,
+        hw_accel: bool = True
+    ):
         """
         Args:
             src: RTSP 스트림 URL
             buffer_size: OpenCV 버퍼 크기 (1 권장)
+            target_fps: 소비자 처리 FPS (지정 시 그 주기로만 프레임을 변환/저장)
+            hw_accel: 하드웨어 디코딩 사용 여부 (불가능하면 자동으로 CPU 디코딩)
         """
         self.src = src
         self.buffer_size = buffer_size
+        self.hw_accel = hw_accel
+        self.frame_interval = 1.0 / target_fps if target_fps else 0.0
         
         self.cap: Optional[cv2.VideoCapture] = None
-        self.lock = threading.Lock()
-        self.ret = False
-        self.frame: Optional[np.ndarray] = None
+        self._bufs: List[Optional[np.ndarray]] = [None, None, None]
+        self._latest_idx = -1  # 가장 최근에 완성된 버퍼 (-1: 없음)
+        self._reading_idx = -1  # 소비자가 사용 중인 버퍼 (-1: 없음)
+        self._seq = 0  # 새 프레임 게시마다 증가
+        self._read_seq = 0  # 소비자가 마지막으로 읽은 시퀀스
+        self._new_frame = threading.Event()  # 새 프레임 게시 알림 (read_new 대기용)
         self.stopped = False
         self.paused = False
         self._pause_event = threading.Event()
@@ -44,8 +68,7 @@ class LatestFrameReader:
     def _connect(self) -> bool:
         """스트림 연결"""
         try:
-            self.cap = cv2.VideoCapture(self.src)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+            self.cap = self._open_capture()
             
             if not self.cap.isOpened():
                 log(f"⚠️ 스트림 연결 실패: {self.src}")
@@ -59,6 +82,16 @@ class LatestFrameReader:
             log(f"❌ 스트림 연결 오류: {e}")
             return False
     
+    def _open_capture(self) -> cv2.VideoCapture:
+        """FFmpeg 백엔드로 캡처 생성 (가능하면 하드웨어 디코딩)"""
+        params = []
+        if self.hw_accel and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            params = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        
+        cap = cv2.VideoCapture(self.src, cv2.CAP_FFMPEG, params)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return cap
+    
     def _start_thread(self) -> None:
         """프레임 읽기 스레드 시작"""
         if self.thread is not None and self.thread.is_alive():
@@ -72,6 +105,8 @@ class LatestFrameReader:
         """프레임 업데이트 루프 (백그라운드 스레드)"""
         consecutive_failures = 0
         max_failures = 30  # 30회 연속 실패 시 재연결
+        next_deadline = 0.0  # 다음 프레임 변환 시각
+        early_margin = self.frame_interval * 0.5  # 마감보다 이만큼 일찍 온 프레임까지 허용 (도착 지터 흡수)
         
         while not self.stopped:
             # Check if paused
@@ -97,7 +132,25 @@ class LatestFrameReader:
                 continue
             
             try:
-                ret, frame = self.cap.read()
+                # grab()은 스트림을 따라가기만 하고, BGR 변환/복사는 retrieve()에서만 수행
+                # (grab() 자체가 다음 패킷까지 블로킹되므로 별도 sleep 불필요)
+                ret = self.cap.grab()
+                frame = None
+                
+                if ret:
+                    now = time.monotonic()
+                    if now < next_deadline - early_margin:
+                        # 소비 주기 전의 프레임은 변환하지 않고 건너뜀
+                        consecutive_failures = 0
+                        continue
+                    # 마감은 도착 시각이 아니라 이전 마감 기준으로 진행 (누적 지연으로 FPS가 떨어지지 않도록)
+                    next_deadline += self.frame_interval
+                    if next_deadline < now:
+                        # 한 주기 이상 밀린 경우(시작/재연결/일시정지 후)에만 기준 재설정
+                        next_deadline = now + self.frame_interval
+                    
+                    write_idx = self._next_write_idx()
+                    ret, frame = self.cap.retrieve(self._bufs[write_idx])  # 버퍼 재사용
                 
                 if not ret or frame is None:
                     consecutive_failures += 1
@@ -110,24 +163,31 @@ class LatestFrameReader:
                 
                 consecutive_failures = 0
                 
-                with self.lock:
-                    self.ret = ret
-                    self.frame = frame
-                
-                time.sleep(0.005)  # CPU 사용률 조절
+                # 해상도가 바뀌면 OpenCV가 새 배열을 반환하므로 버퍼 교체
+                self._bufs[write_idx] = frame
+                self._latest_idx = write_idx  # 게시 후 시퀀스 증가 (순서 중요)
+                self._seq += 1
+                self._new_frame.set()
                 
             except Exception as e:
-                log(f"⚠️ 프레임 읽기 오류: {e}")
+                log_warning("⚠️ 프레임 읽기 오류: %s", e)
                 time.sleep(0.1)
     
+    def _next_write_idx(self) -> int:
+        """최신 버퍼와 읽는 중인 버퍼를 제외한 쓰기 버퍼 선택"""
+        busy = (self._latest_idx, self._reading_idx)
+        for idx in range(len(self._bufs)):
+            if idx not in busy:
+                return idx
+        return 0  # 도달 불가 (버퍼 3개 중 최대 2개만 사용 중)
+    
     def _reconnect(self) -> None:
         """스트림 재연결"""
         try:
             if self.cap is not None:
                 self.cap.release()
             
-            self.cap = cv2.VideoCapture(self.src)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+            self.cap = self._open_capture()
             
             if self.cap.isOpened():
                 log("✅ 스트림 재연결 성공")
@@ -141,19 +201,51 @@ class LatestFrameReader:
         """
         최신 프레임 읽기
         
+        반환된 프레임은 복사본이 아니라 내부 버퍼이며, 다음 read() 호출 전까지만
+        유효합니다. 프레임을 수정하거나 보관하려면 호출자가 직접 복사해야 합니다.
+        
         Returns:
             (성공 여부, 프레임) 튜플
         """
-        with self.lock:
-            if self.frame is not None and not self.paused:
-                return self.ret, self.frame.copy()
-            return False, None
+        while True:
+            seq = self._seq
+            idx = self._latest_idx
+            if idx < 0 or self.paused:
+                return False, None
+            
+            self._reading_idx = idx
+            
+            # 읽는 도중 새 프레임이 게시되지 않았으면 idx 버퍼는 쓰기 대상이 아님
+            if self._seq == seq:
+                self._read_seq = seq
+                return True, self._bufs[idx]
+    
+    def read_new(self, timeout: float) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        아직 읽지 않은 새 프레임 읽기
+        
+        마지막 read() 이후 게시된 프레임이 없으면 최대 timeout초 동안 대기합니다.
+        추론이 스트림보다 빠를 때 같은 프레임을 반복 처리하지 않도록 사용합니다.
+        
+        Args:
+            timeout: 최대 대기 시간 (초)
+            
+        Returns:
+            (성공 여부, 프레임) 튜플 (시간 초과/일시정지 시 (False, None))
+        """
+        if self._seq == self._read_seq:
+            # clear 후 재확인: 그 사이 게시된 프레임은 set()으로 깨어남
+            self._new_frame.clear()
+            if self._seq == self._read_seq and not self._new_frame.wait(timeout):
+                return False, None
+        return self.read()
     
     def pause(self) -> None:
         """프레임 읽기 일시정지 (CPU/네트워크 절약)"""
         if not self.paused and not self.stopped:
             self.paused = True
             self._pause_event.clear()
+            self._new_frame.set()  # read_new 대기 해제
             
     def resume(self) -> None:
         """프레임 읽기 재개"""
@@ -165,6 +257,7 @@ class LatestFrameReader:
         """리더 정지 및 리소스 해제"""
         self.stopped = True
         self._pause_event.set()  # 깨워서 루프 벗어나게 함
+        self._new_frame.set()
         
         # 스레드 종료 대기
         if self.thread is not None and self.thread.is_alive():
@@ -2,31 +2,35 @@
 상태 핸들러 모듈
 추적, 수색, 대기 등 상태별 로직을 분리하여 처리
 """
-import math
-from abc import ABC, abstractmethod
-from typing import Optional, List, Tuple
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, List, Sequence, Tuple
 import numpy as np
 
 from config import config
 from state import TrackerState
 from ptz_manager import PTZManager
-from debug_utils import get_debug_manager
+from debug_utils import DebugImageManager, get_debug_manager
+from scoring import box_scores
 from utils import log
 
 
 class Detection:
     """감지 결과 클래스"""
     
+    __slots__ = ('box', 'confidence', 'score', 'class_id')
+    
     def __init__(
         self,
-        box: List[float],
+        box: np.ndarray,
         confidence: float,
         score: float,
         class_id: int
     ):
         """
         Args:
-            box: 바운딩 박스 [x1, y1, x2, y2]
+            box: 바운딩 박스 [x1, y1, x2, y2] (감지 결과 배열의 행 뷰, 복사 없음)
             confidence: 모델 신뢰도
             score: 종합 점수 (신뢰도 + 중심 거리)
             class_id: 클래스 ID
@@ -38,111 +42,229 @@ class Detection:
     
     @property
     def center(self) -> Tuple[float, float]:
-        """박스 중심 좌표"""
-        x1, y1, x2, y2 = self.box
-        return (x1 + x2) / 2, (y1 + y2) / 2
+        """박스 중심 좌표 (이후 계산이 NumPy 스칼라 연산이 되지 않도록 float로 반환)"""
+        box = self.box
+        return float(box[0] + box[2]) * 0.5, float(box[1] + box[3]) * 0.5
+
+
+@dataclass(frozen=True, slots=True)
+class FrameGeometry:
+    """
+    프레임 크기 파생값 (세션 동안 고정이므로 프레임 크기가 바뀔 때만 생성)
+    
+    좌표 정규화에 나눗셈 대신 미리 계산한 역수를 곱해서 사용
+    """
+    width: int
+    height: int
+    half_w: float
+    half_h: float
+    inv_w: float
+    inv_h: float
+    inv_half_w: float
+    inv_half_h: float
+    
+    @classmethod
+    def from_size(cls, width: int, height: int) -> 'FrameGeometry':
+        """프레임 너비/높이로부터 생성"""
+        return cls(
+            width, height,
+            width * 0.5, height * 0.5,
+            1.0 / width, 1.0 / height,
+            2.0 / width, 2.0 / height
+        )
+    
+    def matches(self, width: int, height: int) -> bool:
+        """같은 프레임 크기인지 확인"""
+        return self.width == width and self.height == height
+    
+    def roi_around(
+        self,
+        center: Tuple[float, float],
+        ratio: float
+    ) -> Tuple[int, int, int, int]:
+        """
+        정규화 중심 좌표 주변의 ROI 영역 계산 (프레임 밖으로 나가면 안쪽으로 이동)
+        
+        Args:
+            center: 정규화 중심 좌표 (0 ~ 1)
+            ratio: 프레임 대비 ROI 크기 비율
+            
+        Returns:
+            (x1, y1, x2, y2) 픽셀 좌표
+        """
+        rw = int(self.width * ratio)
+        rh = int(self.height * ratio)
+        x1 = min(max(int(center[0] * self.width) - rw // 2, 0), self.width - rw)
+        y1 = min(max(int(center[1] * self.height) - rh // 2, 0), self.height - rh)
+        return x1, y1, x1 + rw, y1 + rh
 
 
 class DetectionProcessor:
     """YOLO 감지 결과 처리 클래스"""
     
     @staticmethod
-    def find_best_target(
+    def find_best_per_class(
         results,
-        frame_width: int,
-        frame_height: int,
-        target_classes: Optional[List[int]] = None,
-        last_target_center: Optional[Tuple[float, float]] = None
-    ) -> Optional[Detection]:
+        geom: FrameGeometry,
+        target_classes: Optional[Sequence[int]] = None,
+        last_target_center: Optional[Tuple[float, float]] = None,
+        offset: Optional[Tuple[int, int]] = None
+    ) -> Dict[int, Detection]:
         """
-        최적의 추적 타겟 선정
+        클래스별 최적 타겟 선정 (텐서 변환과 마스킹은 1회만 수행)
         
         Args:
-            results: YOLO 추론 결과
-            frame_width: 프레임 너비
-            frame_height: 프레임 높이
-            target_classes: 추적 대상 클래스 ID 리스트 (None이면 [1])
+            results: YOLO 추론 결과 (단일 프레임)
+            geom: 프레임 크기 파생값
+            target_classes: 추적 대상 클래스 ID 목록 (None이면 (1,))
             last_target_center: 마지막 정후 위치 (Fallback 거리 제한용, 정규화 좌표)
+            offset: ROI 추론 결과일 때 ROI 좌상단 좌표 (박스를 전체 프레임 좌표로 이동)
             
         Returns:
-            최적 타겟 Detection 또는 None
+            {클래스 ID: 최적 Detection} (감지되지 않은 클래스는 키 없음)
+        """
+        best: Dict[int, Detection] = {}
+        candidates = DetectionProcessor._extract_candidates(
+            results, geom, target_classes, last_target_center, offset
+        )
+        if candidates is None:
+            return best
+        
+        xyxy, confs, classes, mask = candidates
+        
+        # 점수는 한 번만 계산하고 클래스별로 argmax만 수행 (마스크 밖은 -inf)
+        scores = box_scores(
+            xyxy, confs, mask, geom.half_w, geom.half_h,
+            geom.inv_half_w, geom.inv_half_h,
+            config.CONFIDENCE_WEIGHT, config.DISTANCE_WEIGHT
+        )
+        for class_id in np.unique(classes[mask]).tolist():
+            i = int(np.where(classes == class_id, scores, -np.inf).argmax())
+            best[class_id] = Detection(
+                box=xyxy[i],
+                confidence=float(confs[i]),
+                score=float(scores[i]),
+                class_id=class_id
+            )
+        return best
+    
+    @staticmethod
+    def _extract_candidates(
+        results,
+        geom: FrameGeometry,
+        target_classes: Optional[Sequence[int]],
+        last_target_center: Optional[Tuple[float, float]],
+        offset: Optional[Tuple[int, int]] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        추론 결과를 NumPy 배열로 변환하고 후보 마스크 생성
+        
+        Returns:
+            (xyxy, confs, classes, mask) 또는 후보가 없으면 None
         """
         if target_classes is None:
-            target_classes = [1]
+            target_classes = (1,)
             
-        cx, cy = frame_width / 2, frame_height / 2
-        best_target: Optional[Detection] = None
-        best_score = -1.0
+        # 단일 프레임 추론이므로 결과는 항상 1개 (results[0]만 사용)
+        if not results:
+            return None
         
-        for result in results:
-            boxes = result.boxes
-            if boxes is None or len(boxes) == 0:
-                continue
-            
-            # 한 번에 NumPy 변환 (최적화)
-            xyxy = boxes.xyxy.cpu().numpy()
-            confs = boxes.conf.cpu().numpy()
-            classes = boxes.cls.cpu().numpy()  # 클래스 ID
-            
-            for i in range(len(xyxy)):
-                class_id = int(classes[i])
-                
-                # 타겟 클래스가 아니면 스킵
-                if class_id not in target_classes:
-                    continue
-                
-                x1, y1, x2, y2 = xyxy[i]
-                conf = float(confs[i])
-                
-                # 박스 중심 계산
-                bx_cx = (x1 + x2) / 2
-                bx_cy = (y1 + y2) / 2
-                
-                # 중심 정규화 좌표 (0.0 ~ 1.0)
-                norm_cx = bx_cx / frame_width
-                norm_cy = bx_cy / frame_height
-                
-                # Fallback 거리 제한 확인 (마지막 위치가 있고, 정후 클래스가 아닌 경우)
-                if last_target_center is not None and class_id != 1:
-                    last_cx, last_cy = last_target_center
-                    dist = math.sqrt((norm_cx - last_cx)**2 + (norm_cy - last_cy)**2)
-                    
-                    if dist > config.MAX_FALLBACK_DISTANCE:
-                        # 너무 멀리 있는 대체 타겟은 무시
-                        continue
-
-                # 중심으로부터의 정규화된 거리
-                dist_x = abs(bx_cx - cx) / (frame_width / 2)
-                dist_y = abs(bx_cy - cy) / (frame_height / 2)
-                dist_factor = (dist_x + dist_y) / 2
-                
-                # 가중 점수 계산
-                score = (
-                    conf * config.CONFIDENCE_WEIGHT +
-                    (1.0 - dist_factor) * config.DISTANCE_WEIGHT
-                )
-                
-                if score > best_score:
-                    best_score = score
-                    best_target = Detection(
-                        box=[x1, y1, x2, y2],
-                        confidence=conf,
-                        score=score,
-                        class_id=class_id
-                    )
+        boxes = results[0].boxes
+        if boxes is None or len(boxes) == 0:
+            return None
         
-        return best_target
+        # boxes.data ([N, 6] = x1, y1, x2, y2, conf, cls)를 한 번만 변환 후 열 슬라이싱
+        # (CPU 텐서는 복사 없이 변환, GPU 텐서도 호스트 동기화는 1회)
+        data = DetectionProcessor._to_numpy(boxes.data)
+        xyxy = data[:, :4]
+        confs = data[:, 4]
+        classes = data[:, 5].astype(np.int64, copy=False)  # 클래스 ID
+        
+        # ROI 추론 결과는 전체 프레임 좌표로 이동 (결과 텐서는 수정하지 않도록 새 배열)
+        if offset is not None:
+            ox, oy = offset
+            xyxy = xyxy + np.array((ox, oy, ox, oy), dtype=xyxy.dtype)
+        
+        # 타겟 클래스 마스크 (비트마스크 시프트 1회, 박스별 멤버십 검사 없음)
+        bits = DetectionProcessor._class_bitmask(tuple(target_classes))
+        mask = ((bits >> classes) & 1).astype(bool)
+        if not mask.any():
+            return None
+        
+        # Fallback 거리 제한 (마지막 위치가 있으면 정후가 아닌 먼 박스 제외)
+        if last_target_center is not None:
+            last_cx, last_cy = last_target_center
+            bx_cx = (xyxy[:, 0] + xyxy[:, 2]) * 0.5
+            bx_cy = (xyxy[:, 1] + xyxy[:, 3]) * 0.5
+            # 제곱 거리끼리 비교 (sqrt 생략)
+            dist_sq = (
+                np.square(bx_cx * geom.inv_w - last_cx) +
+                np.square(bx_cy * geom.inv_h - last_cy)
+            )
+            mask &= (classes == 1) | (dist_sq <= config.MAX_FALLBACK_DISTANCE_SQ)
+            if not mask.any():
+                return None
+        
+        return xyxy, confs, classes, mask
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _class_bitmask(target_classes: Tuple[int, ...]) -> np.int64:
+        """클래스 ID 목록을 비트마스크로 변환 (bit c = 클래스 c 포함, c < 63)"""
+        bits = 0
+        for c in target_classes:
+            bits |= 1 << c
+        return np.int64(bits)
+    
+    @staticmethod
+    def _to_numpy(tensor) -> np.ndarray:
+        """
+        텐서를 NumPy 배열로 변환
+        
+        CPU 텐서(OpenVINO 추론)는 .cpu() 호출 없이 메모리를 공유하는 뷰를 반환하고,
+        GPU 텐서일 때만 호스트로 복사합니다.
+        """
+        if isinstance(tensor, np.ndarray):
+            return tensor
+        if tensor.device.type != 'cpu':
+            tensor = tensor.cpu()
+        return tensor.numpy()
 
 
 class VelocityCalculator:
     """PTZ 속도 계산 클래스"""
     
+    # 축별 속도 룩업 테이블: min((|오차| * 배율) ** VELOCITY_EXPONENT, 1.0)
+    # 정규화 오차 |dx|, |dy|는 0 ~ 0.5 범위이므로 이 구간을 LUT_SIZE 등분
+    # (배율/지수/클램프가 모두 테이블에 반영되어 있어 계산 시 인덱싱만 수행)
+    LUT_SIZE = 256
+    LUT_SCALE = LUT_SIZE / 0.5  # 오차 -> 인덱스 변환 계수
+    _luts: Tuple[List[float], List[float]] = ([], [])
+    _lut_key: Optional[Tuple[float, float, float]] = None
+    
+    @staticmethod
+    def _get_luts() -> Tuple[List[float], List[float]]:
+        """(pan, tilt) 속도 LUT 반환 (배율/지수가 바뀌면 재생성)"""
+        key = (
+            config.PAN_VELOCITY_MULTIPLIER,
+            config.TILT_VELOCITY_MULTIPLIER,
+            config.VELOCITY_EXPONENT
+        )
+        if VelocityCalculator._lut_key != key:
+            pan_mult, tilt_mult, exponent = key
+            err = np.linspace(0.0, 0.5, VelocityCalculator.LUT_SIZE + 1)
+            VelocityCalculator._luts = (
+                np.minimum(np.power(err * pan_mult, exponent), 1.0).tolist(),
+                np.minimum(np.power(err * tilt_mult, exponent), 1.0).tolist()
+            )
+            VelocityCalculator._lut_key = key
+        return VelocityCalculator._luts
+    
     @staticmethod
     def calculate(
         target_x: float,
         target_y: float,
-        frame_width: int,
-        frame_height: int
+        geom: FrameGeometry
     ) -> Tuple[float, float]:
         """
         타겟 위치에 따른 PTZ 속도 계산
@@ -150,273 +272,267 @@ class VelocityCalculator:
         Args:
             target_x: 타겟 X 좌표
             target_y: 타겟 Y 좌표
-            frame_width: 프레임 너비
-            frame_height: 프레임 높이
+            geom: 프레임 크기 파생값
             
         Returns:
             (pan_velocity, tilt_velocity) 튜플
         """
-        cx, cy = frame_width / 2, frame_height / 2
-        
         # 정규화된 오차
-        dx = (target_x - cx) / frame_width
-        dy = (target_y - cy) / frame_height
+        dx = (target_x - geom.half_w) * geom.inv_w
+        dy = (target_y - geom.half_h) * geom.inv_h
         
         pan_val = 0.0
         tilt_val = 0.0
         
-        # 데드존 외부에서만 속도 계산
-        if abs(dx) > config.PAN_DEAD_ZONE:
-            speed = min(
-                abs(dx * config.PAN_VELOCITY_MULTIPLIER) ** config.VELOCITY_EXPONENT,
-                1.0
-            )
-            pan_val = math.copysign(speed, dx)
+        # 속도는 LUT 인덱싱만으로 계산 (배율/지수/클램프 반영된 테이블)
+        pan_lut, tilt_lut = VelocityCalculator._get_luts()
+        size = VelocityCalculator.LUT_SIZE
+        scale = VelocityCalculator.LUT_SCALE
         
-        if abs(dy) > config.TILT_DEAD_ZONE:
-            speed = min(
-                abs(dy * config.TILT_VELOCITY_MULTIPLIER) ** config.VELOCITY_EXPONENT,
-                1.0
-            )
+        # 데드존 외부에서만 속도 계산 (부호는 copysign 대신 조건 반전)
+        ax = abs(dx)
+        if ax > config.PAN_DEAD_ZONE:
+            speed = pan_lut[min(int(ax * scale + 0.5), size)]
+            pan_val = speed if dx >= 0 else -speed
+        
+        ay = abs(dy)
+        if ay > config.TILT_DEAD_ZONE:
+            speed = tilt_lut[min(int(ay * scale + 0.5), size)]
             # Y축은 반전 (화면 아래 = 틸트 위로)
-            tilt_val = math.copysign(speed, -dy)
+            tilt_val = -speed if dy >= 0 else speed
         
         return pan_val, tilt_val
 
 
-class StateHandler(ABC):
-    """상태 핸들러 추상 기본 클래스"""
-    
-    @abstractmethod
-    def handle(
-        self,
-        frame: np.ndarray,
-        detection: Optional[Detection],
-        state: TrackerState,
-        ptz: PTZManager
-    ) -> None:
-        """
-        상태별 처리 로직
-        
-        Args:
-            frame: 현재 프레임
-            detection: 감지 결과 (없으면 None)
-            state: 트래커 상태
-            ptz: PTZ 매니저
-        """
-        pass
+# === 상태별 처리 함수 ===
+# StateRouter가 상태에 따라 직접 호출 (추상 클래스/메서드 디스패치 없음)
+#
+# 공통 인자:
+#   frame: 현재 프레임
+#   detection: 감지 결과 (없으면 None)
+#   state: 트래커 상태
+#   ptz: PTZ 매니저
+#   geom: 프레임 크기 파생값
+#   debug: 디버그 이미지 매니저 (라우터가 생성 시 한 번 조회해 주입)
+#   now: 현재 시각 (라우터가 틱마다 한 번 읽은 값)
 
 
-class TrackingHandler(StateHandler):
-    """타겟 추적 상태 핸들러"""
+def handle_tracking(
+    frame: np.ndarray,
+    detection: Optional[Detection],
+    state: TrackerState,
+    ptz: PTZManager,
+    geom: FrameGeometry,
+    debug: DebugImageManager,
+    now: float
+) -> None:
+    """타겟 추적 상태 처리"""
+    # 감지된 경우 (정상 추적)
+    if detection is not None:
+        # 처음 타겟 발견 시 로그
+        if not state.was_tracking:
+            log(f"👁️ 타겟 발견! 추적 시작 (Conf: {detection.confidence:.2f})")
     
-    def handle(
-        self,
-        frame: np.ndarray,
-        detection: Optional[Detection],
-        state: TrackerState,
-        ptz: PTZManager
-    ) -> None:
-        # 감지된 경우 (정상 추적)
-        if detection is not None:
-            h, w = frame.shape[:2]
-            
-            # 처음 타겟 발견 시 로그
-            if not state.was_tracking:
-                log(f"👁️ 타겟 발견! 추적 시작 (Conf: {detection.confidence:.2f})")
-            
-            # 놓침 카운트 복구
-            if state.loss_count > 0:
-                 log(f"👁️ 타겟 재감지! 추적 계속 (놓침 {state.loss_count}회 만에 복구)")
-                 state.reset_loss_count()
-            
-            # 정후(Class 1)를 찾았으면 Fallback 타이머 초기화 & 마지막 위치 갱신
-            if detection.class_id == 1:
-                state.reset_fallback_timer()
-                # 정규화된 중심 좌표 저장
-                cx, cy = detection.center
-                state.update_last_target_pos((cx / w, cy / h))
-            
-            # 대체 타겟(Class 0, 2)인 경우 시간 제한 확인
-            else:
-                if state.fallback_start_time == 0.0:
-                    state.start_fallback_timer()
-                    log(f"⚠️ 대체 타겟(Class {detection.class_id}) 추적 시작 (최대 {config.MAX_FALLBACK_DURATION}초)")
-                
-                if state.is_fallback_timeout(config.MAX_FALLBACK_DURATION):
-                    log("🚫 대체 추적 시간 초과! -> 추적 중단")
-                    ptz.stop()
-                    state.unlock_target()
-                    state.reset_fallback_timer()
-                    return
-
-            # 상태 업데이트
-            state.lock_target()
-            
-            # 속도 계산
-            tx, ty = detection.center
-            pan_val, tilt_val = VelocityCalculator.calculate(tx, ty, w, h)
-            
-            # PTZ 제어
-            ptz.set_velocity(pan_val, tilt_val)
-            
-            # 디버그 이미지 저장
-            debug = get_debug_manager()
-            debug.save_debug_image(
-                frame, state,
-                box=detection.box,
-                conf=detection.confidence,
-                pan=pan_val,
-                tilt=tilt_val,
-                status_override=f"[FALLBACK] Class {detection.class_id}" if detection.class_id != 1 else None
-            )
-
-        # 감지 안 된 경우 (유예 상태)
+        # 놓침 카운트 복구
+        if state.loss_count > 0:
+             log(f"👁️ 타겟 재감지! 추적 계속 (놓침 {state.loss_count}회 만에 복구)")
+             state.reset_loss_count()
+    
+        # 정후(Class 1)를 찾았으면 Fallback 타이머 초기화 & 마지막 위치 갱신
+        if detection.class_id == 1:
+            state.reset_fallback_timer()
+            # 정규화된 중심 좌표 저장
+            cx, cy = detection.center
+            state.update_last_target_pos((cx * geom.inv_w, cy * geom.inv_h))
+    
+        # 대체 타겟(Class 0, 2)인 경우 시간 제한 확인
         else:
-            # 유예 기간 동안은 정지
-            ptz.stop()
-            
-            # 로그는 너무 자주 찍지 않도록 간헐적으로 출력 또는 생략
-            if state.loss_count % 5 == 0:
-                log(f"⚠️ 타겟 놓침 유예 중... ({state.loss_count}/{config.TRACKING_PATIENCE_COUNT})")
-            
-            # 디버그 이미지 (유예 상태 표시)
-            debug = get_debug_manager()
-            debug.save_debug_image(
-                frame, state,
-                status_override=f"[WAIT] Patience {state.loss_count}/{config.TRACKING_PATIENCE_COUNT}"
-            )
-
-
-class LostHandler(StateHandler):
-    """타겟 놓침 상태 핸들러"""
+            if state.fallback_start_time == 0.0:
+                state.start_fallback_timer(now)
+                log(f"⚠️ 대체 타겟(Class {detection.class_id}) 추적 시작 (최대 {config.MAX_FALLBACK_DURATION}초)")
     
-    def handle(
-        self,
-        frame: np.ndarray,
-        detection: Optional[Detection],
-        state: TrackerState,
-        ptz: PTZManager
-    ) -> None:
-        log("🚫 타겟 놓침! (유예 시간 초과) -> 카메라 정지")
-        
+            if state.is_fallback_timeout(config.MAX_FALLBACK_DURATION, now):
+                log("🚫 대체 추적 시간 초과! -> 추적 중단")
+                ptz.stop()
+                state.unlock_target()
+                state.reset_fallback_timer()
+                return
+    
+        # 상태 업데이트
+        state.lock_target()
+    
+        # 속도 계산
+        tx, ty = detection.center
+        pan_val, tilt_val = VelocityCalculator.calculate(tx, ty, geom)
+    
+        # PTZ 제어
+        ptz.set_velocity(pan_val, tilt_val)
+    
+        # 디버그 이미지 저장
+        debug.save_debug_image(
+            frame, state,
+            box=detection.box,
+            conf=detection.confidence,
+            pan=pan_val,
+            tilt=tilt_val,
+            status_override=f"[FALLBACK] Class {detection.class_id}" if detection.class_id != 1 else None,
+            now=now
+        )
+    
+    # 감지 안 된 경우 (유예 상태)
+    else:
+        # 유예 기간 동안은 정지
         ptz.stop()
-        state.unlock_target()
-        state.reset_loss_count()  # 카운트 초기화
-        
-        # 놓친 순간 디버그 이미지 저장
-        debug = get_debug_manager()
+    
+        # 로그는 너무 자주 찍지 않도록 간헐적으로 출력 또는 생략
+        if state.loss_count % 5 == 0:
+            log("⚠️ 타겟 놓침 유예 중... (%d/%d)", state.loss_count, config.TRACKING_PATIENCE_COUNT)
+    
+        # 디버그 이미지 (유예 상태 표시)
         debug.save_debug_image(
             frame, state,
-            status_override="[LOST] Target Disappeared"
+            status_override=f"[WAIT] Patience {state.loss_count}/{config.TRACKING_PATIENCE_COUNT}",
+            now=now
         )
 
 
-class SearchingHandler(StateHandler):
-    """소리 감지 수색 상태 핸들러"""
+def handle_lost(
+    frame: np.ndarray,
+    detection: Optional[Detection],
+    state: TrackerState,
+    ptz: PTZManager,
+    geom: FrameGeometry,
+    debug: DebugImageManager,
+    now: float
+) -> None:
+    """타겟 놓침 상태 처리"""
+    log("🚫 타겟 놓침! (유예 시간 초과) -> 카메라 정지")
     
-    def handle(
-        self,
-        frame: np.ndarray,
-        detection: Optional[Detection],
-        state: TrackerState,
-        ptz: PTZManager
-    ) -> None:
-        state.target_locked = False
-        state.reset_loss_count()
-        
-        # 수색 시간 종료 확인
-        if state.is_search_timeout(config.AUDIO_TRIGGER_TIME):
-            log("💤 수색 시간 종료 (5분 경과) -> 대기 모드")
-            state.stop_searching()
-            ptz.stop()
-            return
-        
-        # 프리셋 이동 시간 확인
-        if state.should_move_preset(config.SCAN_INTERVAL):
-            idx = state.next_preset(len(config.SEARCH_PRESETS))
-            target_preset = config.SEARCH_PRESETS[idx]
-            
-            log(f"🔎 수색 중: 프리셋 {target_preset}번으로 이동")
-            ptz.goto_preset(target_preset)
-            
-            debug = get_debug_manager()
-            debug.save_debug_image(frame, state)
-        else:
-            # 관찰 중 주기적 로그
-            if state.can_log_status(config.SEARCH_LOG_INTERVAL):
-                remain = state.get_scan_remaining_time(config.SCAN_INTERVAL)
-                log(f"👀 관찰 중... (다음 이동까지 {remain}초)")
-                state.mark_status_logged()
-                
-                debug = get_debug_manager()
-                debug.save_debug_image(frame, state)
+    ptz.stop()
+    state.unlock_target()
+    state.reset_loss_count()  # 카운트 초기화
+    
+    # 놓친 순간 디버그 이미지 저장
+    debug.save_debug_image(
+        frame, state,
+        status_override="[LOST] Target Disappeared",
+        now=now
+    )
 
 
-class IdleHandler(StateHandler):
-    """대기 상태 핸들러"""
+def handle_searching(
+    frame: np.ndarray,
+    detection: Optional[Detection],
+    state: TrackerState,
+    ptz: PTZManager,
+    geom: FrameGeometry,
+    debug: DebugImageManager,
+    now: float
+) -> None:
+    """소리 감지 수색 상태 처리"""
+    state.target_locked = False
+    state.reset_loss_count()
     
-    def handle(
-        self,
-        frame: np.ndarray,
-        detection: Optional[Detection],
-        state: TrackerState,
-        ptz: PTZManager
-    ) -> None:
-        state.target_locked = False
-        state.reset_loss_count()
+    # 수색 시간 종료 확인
+    if state.is_search_timeout(config.AUDIO_TRIGGER_TIME, now):
+        log("💤 수색 시간 종료 (5분 경과) -> 대기 모드")
+        state.stop_searching()
         ptz.stop()
-        
-        # 주기적 상태 로그 및 디버그 이미지
-        if state.can_log_status(config.STATUS_LOG_INTERVAL):
-            state.mark_status_logged()
-            
-            debug = get_debug_manager()
-            debug.save_debug_image(frame, state)
+        return
+    
+    # 프리셋 이동 시간 확인
+    if state.should_move_preset(config.SCAN_INTERVAL, now):
+        idx = state.next_preset(len(config.SEARCH_PRESETS), now)
+        target_preset = config.SEARCH_PRESETS[idx]
+    
+        log(f"🔎 수색 중: 프리셋 {target_preset}번으로 이동")
+        ptz.goto_preset(target_preset)
+    
+        debug.save_debug_image(frame, state, now=now)
+    else:
+        # 관찰 중 주기적 로그
+        if state.can_log_status(config.SEARCH_LOG_INTERVAL, now):
+            remain = state.get_scan_remaining_time(config.SCAN_INTERVAL, now)
+            log(f"👀 관찰 중... (다음 이동까지 {remain}초)")
+            state.mark_status_logged(now)
+    
+            debug.save_debug_image(frame, state, now=now)
+
+
+def handle_idle(
+    frame: np.ndarray,
+    detection: Optional[Detection],
+    state: TrackerState,
+    ptz: PTZManager,
+    geom: FrameGeometry,
+    debug: DebugImageManager,
+    now: float
+) -> None:
+    """대기 상태 처리"""
+    state.target_locked = False
+    state.reset_loss_count()
+    ptz.stop()
+    
+    # 주기적 상태 로그 및 디버그 이미지
+    if state.can_log_status(config.STATUS_LOG_INTERVAL, now):
+        state.mark_status_logged(now)
+    
+        debug.save_debug_image(frame, state, now=now)
 
 
 class StateRouter:
-    """상태에 따라 적절한 핸들러로 라우팅"""
+    """상태에 따라 적절한 처리 함수로 라우팅"""
+    
+    # 디스패치 인덱스
+    TRACKING, LOST, SEARCHING, IDLE = range(4)
     
     def __init__(self):
-        self.tracking_handler = TrackingHandler()
-        self.lost_handler = LostHandler()
-        self.searching_handler = SearchingHandler()
-        self.idle_handler = IdleHandler()
+        self._dispatch = (handle_tracking, handle_lost, handle_searching, handle_idle)
+        self._debug = get_debug_manager()  # 싱글톤은 한 번만 조회해 핸들러에 전달
     
     def route(
         self,
         frame: np.ndarray,
         detection: Optional[Detection],
         state: TrackerState,
-        ptz: PTZManager
+        ptz: PTZManager,
+        geom: FrameGeometry,
+        now: Optional[float] = None
     ) -> None:
         """
-        현재 상태에 맞는 핸들러 실행
+        현재 상태에 맞는 처리 함수 실행
+        
+        시각은 틱마다 한 번만 읽어 모든 시간 판정에 같은 값을 사용
+        (now를 넘기면 호출자가 읽은 값을 그대로 사용)
         """
+        if now is None:
+            now = time.monotonic()
+        
         # 상황 1: 타겟 감지됨 -> 무조건 추적
         if detection is not None:
-            self.tracking_handler.handle(frame, detection, state, ptz)
+            kind = self.TRACKING
         
         # 상황 2: 현재 추적 중 상태 (감지는 안 됨)
         elif state.target_locked:
             state.increment_loss_count()
             
             # 유예 시간 초과 확인
+            # 유예 기간 중이면 계속 추적 처리 (detection=None)
             if state.is_loss_patience_exceeded(config.TRACKING_PATIENCE_COUNT):
-                self.lost_handler.handle(frame, detection, state, ptz)
+                kind = self.LOST
             else:
-                 # 유예 기간 중 -> 계속 TrackingHandler (detection=None)
-                self.tracking_handler.handle(frame, None, state, ptz)
+                kind = self.TRACKING
         
         # 상황 3: 방금 놓침 (State 상 Locked는 아니지만 직전까지 추적함)
-        # -> 이미 LostHandler를 탔거나 Patience 초과 후 LostHandler 호출됨
+        # -> 이미 handle_lost를 탔거나 Patience 초과 후 handle_lost 호출됨
         # -> 여기서는 was_tracking 체크보다는 명시적 상태 위주로 감
         
         # 상황 4: 수색 모드 (소리 감지)
         elif state.is_searching:
-            self.searching_handler.handle(frame, detection, state, ptz)
+            kind = self.SEARCHING
         
         # 상황 5: 대기 모드
         else:
-            self.idle_handler.handle(frame, detection, state, ptz)
+            kind = self.IDLE
+        
+        self._dispatch[kind](frame, detection, state, ptz, geom, self._debug, now)
@@ -0,0 +1,61 @@
+"""
+추론 파이프라인 모듈
+YOLO 추론을 백그라운드 스레드에서 실행하여 후처리/PTZ 제어와 겹치게 처리
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+import numpy as np
+
+
+class PipelinedInference:
+    """
+    1단 파이프라인 추론기
+    
+    현재 프레임을 추론 스레드에 제출하고 직전 프레임의 결과를 반환합니다.
+    메인 스레드가 직전 결과로 타겟 선정/PTZ 제어/디버그 저장을 하는 동안
+    추론 스레드는 다음 프레임을 처리합니다. (지연 1프레임 증가, 처리량 증가)
+    
+    OpenVINO 추론은 GIL을 해제하므로 스레드로도 실제 병렬 실행됩니다.
+    """
+    
+    def __init__(self, predict: Callable[[np.ndarray], Any]):
+        """
+        Args:
+            predict: 프레임 1장을 추론하는 함수 (YOLO 호출 래퍼)
+        """
+        self._predict = predict
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self._pending: Optional[Tuple[np.ndarray, Future]] = None
+    
+    def submit(self, frame: np.ndarray) -> Optional[Tuple[np.ndarray, Any]]:
+        """
+        프레임 제출 후 직전 프레임의 추론 결과 반환
+        
+        리더의 프레임 버퍼는 다음 read() 이후 재사용되므로 제출 시 복사합니다.
+        
+        Args:
+            frame: BGR 프레임
+        
+        Returns:
+            (직전 프레임, 추론 결과) 튜플 (첫 제출 시 None)
+        """
+        frame = frame.copy()
+        prev = self._pending
+        self._pending = (frame, self._executor.submit(self._predict, frame))
+        
+        if prev is None:
+            return None
+        prev_frame, future = prev
+        return prev_frame, future.result()
+    
+    def reset(self) -> None:
+        """진행 중인 추론 결과 폐기 (대기/슬립 진입 등 흐름이 끊길 때)"""
+        if self._pending is not None:
+            _, future = self._pending
+            self._pending = None
+            future.result()  # 추론 스레드가 끝날 때까지 대기 (결과는 버림)
+    
+    def shutdown(self) -> None:
+        """추론 스레드 종료"""
+        self._pending = None
+        self._executor.shutdown(wait=True)
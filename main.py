@@ -4,11 +4,15 @@
 
 Tapo C210 + Frigate + YOLO 기반 아기 추적
 """
+import json
+import os
 import signal
 import sys
+import threading
 import time
-from typing import Optional
+from typing import Dict, Optional
 
+import numpy as np
 import paho.mqtt.client as mqtt
 from ultralytics import YOLO
 
@@ -16,10 +20,12 @@ from config import config
 from state import TrackerState
 from frame_reader import LatestFrameReader
 from ptz_manager import PTZManager
-from handlers import StateRouter, DetectionProcessor
+from handlers import StateRouter, Detection, DetectionProcessor, FrameGeometry
 from debug_utils import get_debug_manager
 from frame_analyzer import FrameAnalyzer
-from utils import log
+from inference import PipelinedInference
+from scoring import warmup_kernel
+from utils import log, log_debug
 
 
 class JeonghooTracker:
@@ -31,12 +37,14 @@ class JeonghooTracker:
         self.mqtt_client: Optional[mqtt.Client] = None
         self.frame_reader: Optional[LatestFrameReader] = None
         self.model: Optional[YOLO] = None
+        self.pipeline: Optional[PipelinedInference] = None  # ASYNC_INFERENCE일 때만 사용
         self.router = StateRouter()
         self.running = False
+        self._frame_geom: Optional[FrameGeometry] = None  # 첫 프레임에서 계산
         
         # FPS 제한
         self.min_frame_time = 1.0 / config.TARGET_FPS
-        self.last_process_time = 0.0
+        self._next_tick = time.monotonic()  # 다음 프레임 처리 마감 시각 (monotonic)
     
     def _setup_signal_handlers(self) -> None:
         """시그널 핸들러 설정 (Graceful Shutdown)"""
@@ -81,8 +89,8 @@ class JeonghooTracker:
                 config.MQTT_KEEPALIVE
             )
             # 오디오 + person 토픽 구독
-            self.mqtt_client.subscribe(config.get_mqtt_audio_topic())
-            self.mqtt_client.subscribe(config.get_mqtt_person_topic())
+            self.mqtt_client.subscribe(config.MQTT_AUDIO_TOPIC)
+            self.mqtt_client.subscribe(config.MQTT_PERSON_TOPIC)
             log(f"✅ MQTT 연결 성공: {config.MQTT_BROKER_IP}")
         except Exception as e:
             log(f"⚠️ MQTT 연결 실패: {e}")
@@ -100,6 +108,32 @@ class JeonghooTracker:
             except Exception as e:
                 log(f"⚠️ MQTT 재연결 실패: {e}")
     
+    def _start_ptz_state_publisher(self) -> None:
+        """PTZ 상태 게시 스레드 시작 (PTZ_STATE_PUBLISH일 때만)"""
+        if not config.PTZ_STATE_PUBLISH or not self.ptz or not self.mqtt_client:
+            return
+        threading.Thread(target=self._ptz_state_loop, daemon=True).start()
+    
+    def _ptz_state_loop(self) -> None:
+        """
+        PTZ 속도가 실제로 바뀔 때만 MQTT로 게시 (폴링 없음)
+        
+        게시 후 최소 간격 동안 쉬고, 그 사이의 변경은 마지막 값 하나로 합쳐 게시합니다.
+        """
+        changed = self.ptz.state_changed
+        published = None
+        while self.running:
+            if not changed.wait(timeout=1.0):
+                continue
+            changed.clear()  # 값을 읽기 전에 해제해야 읽은 뒤의 변경을 놓치지 않음
+            
+            velocity = self.ptz.applied_velocity
+            if velocity != published:
+                payload = json.dumps({'pan': velocity[0], 'tilt': velocity[1]})
+                self.mqtt_client.publish(config.MQTT_PTZ_STATE_TOPIC, payload)
+                published = velocity
+            time.sleep(config.PTZ_STATE_MIN_INTERVAL)
+    
     def _on_mqtt_message(self, client, userdata, msg) -> None:
         """MQTT 메시지 수신 콜백"""
         # 보관된 메시지 무시
@@ -136,23 +170,95 @@ class JeonghooTracker:
             log(f"⚠️ MQTT 메시지 처리 오류: {e}")
     
     def _init_model(self) -> bool:
-        """YOLO 모델 로드"""
-        log(f"🚀 OpenVINO 모델 로딩 중: {config.MODEL_PATH} ...")
+        """YOLO 모델 로드 (MODEL_USE_INT8이고 INT8 모델이 있으면 INT8, 아니면 FP32)"""
+        model_path = config.MODEL_PATH
+        if config.MODEL_USE_INT8:
+            if os.path.isdir(config.MODEL_INT8_PATH):
+                model_path = config.MODEL_INT8_PATH
+            else:
+                log(f"⚠️ INT8 모델 없음 ({config.MODEL_INT8_PATH}) -> FP32 모델 사용")
+        
+        log(f"🚀 OpenVINO 모델 로딩 중: {model_path} ...")
         try:
-            self.model = YOLO(config.MODEL_PATH, task='detect')
+            self.model = YOLO(model_path, task='detect')
+            warmup_kernel()  # 스코어링 커널 JIT 컴파일을 첫 프레임 전에 수행
+            self._warmup_model()
+            if config.ASYNC_INFERENCE:
+                self.pipeline = PipelinedInference(self._predict)
+                log("⚡ 파이프라인 추론 사용 (추론과 후처리 병행, 지연 1프레임)")
             log("✅ 모델 로드 완료")
             return True
         except Exception as e:
             log(f"❌ 모델 로드 실패: {e}")
             return False
     
+    def _warmup_model(self) -> None:
+        """
+        더미 프레임으로 사전 추론
+        
+        첫 추론 시 발생하는 그래프 컴파일/NMS 초기화 지연이 실시간 추적 중에
+        나타나지 않도록, 실제 추론과 같은 인자로 미리 실행합니다.
+        """
+        imgsz = config.MODEL_IMGSZ
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        
+        for i in range(config.MODEL_WARMUP_RUNS):
+            start = time.perf_counter()
+            self._predict(dummy)
+            if config.ROI_INFERENCE:
+                self._predict(dummy, imgsz=config.ROI_IMGSZ)
+            log(f"🔥 모델 워밍업 {i + 1}/{config.MODEL_WARMUP_RUNS}: {(time.perf_counter() - start) * 1000:.0f}ms")
+    
+    def _predict(self, frame: np.ndarray, imgsz: Optional[int] = None):
+        """YOLO 추론 (imgsz로 해상도 최적화, 추적 대상 클래스만 NMS 단계에서 남김)"""
+        return self.model(
+            frame,
+            verbose=False,
+            conf=config.MODEL_CONFIDENCE,
+            imgsz=imgsz or config.MODEL_IMGSZ,
+            classes=list(config.DETECT_CLASSES)
+        )
+    
+    def _predict_roi(self, frame: np.ndarray, geom: FrameGeometry) -> Optional[Dict[int, Detection]]:
+        """
+        정후 추적 중이면 마지막 위치 주변 ROI만 추론
+        
+        Returns:
+            클래스별 최적 타겟 (ROI 조건이 아니거나 ROI에서 정후를 못 찾으면 None)
+        """
+        if not config.ROI_INFERENCE or not self.state.can_use_roi(config.ROI_FULL_FRAME_INTERVAL):
+            return None
+        
+        x1, y1, x2, y2 = geom.roi_around(self.state.last_target_center, config.ROI_SIZE_RATIO)
+        results = self._predict(frame[y1:y2, x1:x2], imgsz=config.ROI_IMGSZ)
+        best = DetectionProcessor.find_best_per_class(
+            results, geom, target_classes=config.DETECT_CLASSES, offset=(x1, y1)
+        )
+        if 1 not in best:
+            return None  # 전체 프레임으로 재추론
+        
+        self.state.mark_roi_inference()
+        return best
+    
+    def _get_geometry(self, frame: np.ndarray) -> FrameGeometry:
+        """프레임 크기 파생값 (해상도가 바뀐 경우에만 재계산)"""
+        h, w = frame.shape[:2]
+        geom = self._frame_geom
+        if geom is None or not geom.matches(w, h):
+            geom = self._frame_geom = FrameGeometry.from_size(w, h)
+        return geom
+    
     def _init_stream(self) -> bool:
         """비디오 스트림 초기화"""
-        rtsp_url = config.get_rtsp_url()
+        rtsp_url = config.RTSP_URL
         log(f"📹 스트림 연결 중: {rtsp_url}")
         
         try:
-            self.frame_reader = LatestFrameReader(rtsp_url)
+            self.frame_reader = LatestFrameReader(
+                rtsp_url,
+                target_fps=config.TARGET_FPS,
+                hw_accel=config.RTSP_HW_ACCEL
+            )
             time.sleep(1)  # 버퍼 채우기 대기
             return True
         except Exception as e:
@@ -198,16 +304,20 @@ class JeonghooTracker:
     def run(self) -> None:
         """메인 추적 루프"""
         self.running = True
+        self._start_ptz_state_publisher()
         
         while self.running:
+            # 시각은 반복마다 한 번만 읽어 모든 상태 판정에 같은 값을 사용
+            now = time.monotonic()
+            
             # === 슬립 모드 처리 (프라이버시 모드) ===
             if self.state.is_sleep_mode:
                 # 슬립 모드에서는 긴 간격으로만 체크
-                if not self.state.can_check_sleep(config.SLEEP_CHECK_INTERVAL):
+                if not self.state.can_check_sleep(config.SLEEP_CHECK_INTERVAL, now):
                     time.sleep(0.1)
                     continue
                 
-                self.state.mark_sleep_checked()
+                self.state.mark_sleep_checked(now)
                 
                 # 프라이버시 확인 전엔 잠시 스트림을 켬
                 if self.frame_reader.paused:
@@ -218,88 +328,108 @@ class JeonghooTracker:
                 if not ret or frame is None:
                     continue
                 
-                if FrameAnalyzer.is_normal_frame(frame):
+                stats = FrameAnalyzer.analyze(frame)
+                if stats.is_normal:
                     # 연속으로 정상 프레임 감지 시 복귀
                     count = self.state.increment_normal_count()
                     if count >= config.SLEEP_WAKE_CHECK_COUNT:
-                        duration = self.state.get_sleep_duration()
+                        duration = self.state.get_sleep_duration(now)
                         log(f"☀️ 프라이버시 모드 해제 감지 -> 정상 모드 복귀 (슬립 {duration}초)")
                         self.state.exit_sleep_mode()
                 else:
                     self.state.reset_normal_count()
                     # 주기적으로 슬립 상태 로그
-                    if self.state.can_log_status(config.STATUS_LOG_INTERVAL):
-                        duration = self.state.get_sleep_duration()
+                    if self.state.can_log_status(config.STATUS_LOG_INTERVAL, now):
+                        duration = self.state.get_sleep_duration(now)
                         log(f"🌙 슬립 모드 유지 중... ({duration}초 경과)")
-                        self.state.mark_status_logged()
+                        self.state.mark_status_logged(now)
                     
                     # 다시 바로 일시정지
                     self.frame_reader.pause()
                 
                 continue
             
-            # === 정상 모드: FPS 제한 ===
-            current_time = time.time()
-            elapsed = current_time - self.last_process_time
-            
-            if elapsed < self.min_frame_time:
-                time.sleep(self.min_frame_time - elapsed)
-                continue
-            
-            self.last_process_time = time.time()
+            # === 정상 모드: FPS 제한 (마감 시각까지 한 번만 sleep) ===
+            if now < self._next_tick:
+                time.sleep(self._next_tick - now)
+                now = self._next_tick  # sleep 후 시각 (다시 읽지 않음)
+            else:
+                # 대기/슬립 복귀 등으로 밀린 경우 몰아서 처리하지 않도록 기준 재설정
+                self._next_tick = now
+            self._next_tick += self.min_frame_time
             
             # 대기 상태에서 빠져나왔다면(사람 감지/오디오 감지), 스트림 재개
             if self.frame_reader.paused:
                 self.frame_reader.resume()
 
-            # 프레임 읽기
-            ret, frame = self.frame_reader.read()
+            # 프레임 읽기 (디코딩은 리더 스레드에서 추론과 병행, 여기서는 새 프레임만 받음)
+            ret, frame = self.frame_reader.read_new(timeout=config.FRAME_WAIT_TIMEOUT)
             if not ret or frame is None:
                 time.sleep(0.01)
                 continue
             
             # === 프라이버시 모드 감지 ===
-            if FrameAnalyzer.is_privacy_mode(frame):
+            stats = FrameAnalyzer.analyze(frame)
+            if stats.is_privacy:
                 log("🌙 프라이버시 모드 감지 -> 슬립 모드 진입 (CPU 절약)")
-                self.state.enter_sleep_mode()
+                self.state.enter_sleep_mode(now)
                 self.ptz.stop()
+                if self.pipeline:
+                    self.pipeline.reset()
                 continue
             
             # === 대기 모드 (사람 없음 + 수색 아님) ===
-            if self.state.is_idle_mode(config.PERSON_TIMEOUT):
+            if self.state.is_idle_mode(config.PERSON_TIMEOUT, now):
                 # 대기 모드에서는 스트림 수신 완전 중단으로 CPU 절약
-                if self.state.can_log_status(config.STATUS_LOG_INTERVAL):
+                if self.state.can_log_status(config.STATUS_LOG_INTERVAL, now):
                     log("💤 대기 모드 (사람 없음, RTSP 스트림 일시정지)")
-                    self.state.mark_status_logged()
+                    self.state.mark_status_logged(now)
                 self.ptz.stop()
                 self.frame_reader.pause()
+                if self.pipeline:
+                    self.pipeline.reset()
                 time.sleep(config.IDLE_CHECK_INTERVAL)
                 continue
             
-            # YOLO 추론 (imgsz로 해상도 최적화)
-            results = self.model(
-                frame,
-                verbose=False,
-                conf=config.MODEL_CONFIDENCE,
-                imgsz=config.MODEL_IMGSZ
-            )
+            # YOLO 추론
+            best = None
+            if self.pipeline:
+                # 현재 프레임을 제출하고 직전 프레임과 그 결과로 이후 처리
+                done = self.pipeline.submit(frame)
+                if done is None:
+                    continue
+                frame, results = done
+                geom = self._get_geometry(frame)
+            else:
+                geom = self._get_geometry(frame)
+                best = self._predict_roi(frame, geom)
+                if best is None:
+                    results = self._predict(frame)
+            
+            # 클래스별 최적 타겟 (한 번의 패스로 정후/가족 모두 선정)
+            if best is None:
+                self.state.reset_roi_count()
+                best = DetectionProcessor.find_best_per_class(
+                    results, geom, target_classes=config.DETECT_CLASSES
+                )
             
-            # 최적 타겟 선정 (1순위: 정후)
-            h, w = frame.shape[:2]
-            detection = DetectionProcessor.find_best_target(results, w, h, target_classes=[1])
+            # 1순위: 정후
+            detection = best.get(1)
             
-            # Fallback 로직: 추적 중인데 정후가 안 보이면 가족(0, 2) 확인
-            if detection is None and (self.state.target_locked or self.state.was_tracking):
-                detection = DetectionProcessor.find_best_target(
-                    results, w, h, target_classes=config.FALLBACK_CLASSES
+            # Fallback 로직: 추적 중인데 정후가 안 보이면 가족(0, 2) 중 최고 점수 선택
+            # (감지된 박스가 없으면 best가 비어 있으므로 바로 건너뜀)
+            if detection is None and best and (self.state.target_locked or self.state.was_tracking):
+                detection = max(
+                    (best[c] for c in config.FALLBACK_CLASSES if c in best),
+                    key=lambda d: d.score,
+                    default=None
                 )
                 if detection is not None:
-                    # Fallback 성공 시 로그 (디버깅용)
-                    # log(f"⚠️ 정후 놓침 -> 대체 타겟(Class {detection.class_id}) 추적")
-                    pass
+                    # Fallback 성공 시 로그 (디버깅용, LOG_LEVEL=DEBUG에서만 출력)
+                    log_debug("⚠️ 정후 놓침 -> 대체 타겟(Class %d) 추적", detection.class_id)
             
             # 상태별 처리
-            self.router.route(frame, detection, self.state, self.ptz)
+            self.router.route(frame, detection, self.state, self.ptz, geom, now)
     
     def shutdown(self) -> None:
         """시스템 종료"""
@@ -312,6 +442,11 @@ class JeonghooTracker:
         if self.ptz:
             self.ptz.shutdown()
         
+        if self.pipeline:
+            self.pipeline.shutdown()
+        
+        get_debug_manager().shutdown()
+        
         if self.mqtt_client:
             self.mqtt_client.loop_stop()
             self.mqtt_client.disconnect()
@@ -2,35 +2,105 @@
 PTZ 매니저 모듈
 Tapo 카메라 PTZ 제어를 담당하는 클래스
 """
+import os
 import time
+import base64
+import hashlib
+import random
 import threading
-from typing import Optional, Any
+from typing import Dict, Optional, Tuple, Any
+from xml.sax.saxutils import escape
 
+import requests
+from requests.adapters import HTTPAdapter
 from onvif import ONVIFCamera
+from zeep.transports import Transport
 
 from config import config
-from utils import log
+from utils import log, log_error, log_warning
+
+# 연속 이동 명령 SOAP 1.2 본문 조각 (속도 값과 WS-Security 헤더만 매번 채움)
+_SOAP_HEADERS = {
+    'Content-Type': 'application/soap+xml; charset=utf-8; '
+                    'action="http://www.onvif.org/ver20/ptz/wsdl/ContinuousMove"'
+}
+_SOAP_HEAD = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope"'
+    b' xmlns:tptz="http://www.onvif.org/ver20/ptz/wsdl"'
+    b' xmlns:tt="http://www.onvif.org/ver10/schema"'
+    b' xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd"'
+    b' xmlns:wsu="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd">'
+    b'<s:Header>'
+)
+_WSSE_TEMPLATE = (
+    b'<wsse:Security s:mustUnderstand="1"><wsse:UsernameToken>'
+    b'<wsse:Username>%s</wsse:Username>'
+    b'<wsse:Password Type="http://docs.oasis-open.org/wss/2004/01/'
+    b'oasis-200401-wss-username-token-profile-1.0#PasswordDigest">%s</wsse:Password>'
+    b'<wsse:Nonce EncodingType="http://docs.oasis-open.org/wss/2004/01/'
+    b'oasis-200401-wss-soap-message-security-1.0#Base64Binary">%s</wsse:Nonce>'
+    b'<wsu:Created>%s</wsu:Created>'
+    b'</wsse:UsernameToken></wsse:Security>'
+)
+_MOVE_BODY_TEMPLATE = (
+    '</s:Header><s:Body><tptz:ContinuousMove>'
+    '<tptz:ProfileToken>{profile}</tptz:ProfileToken>'
+    '<tptz:Velocity><tt:PanTilt x="%g" y="%g"/><tt:Zoom x="0"/></tptz:Velocity>'
+    '</tptz:ContinuousMove></s:Body></s:Envelope>'
+)
 
 
 class PTZManager:
     """
     Tapo 카메라 PTZ 제어 클래스
     
-    백그라운드 스레드에서 지속적으로 PTZ 명령을 전송합니다.
-    재연결 및 에러 복구 로직을 포함합니다.
+    백그라운드 스레드에서 PTZ 명령(속도/프리셋)을 전송합니다.
+    스레드는 명령이 바뀔 때만 깨어나며(Condition), 이동 중에는 keepalive 주기로
+    명령을 재전송합니다. 재연결 및 에러 복구 로직을 포함합니다.
     """
     
+    __slots__ = (
+        'ptz', 'profile', '_session',
+        '_goto_req', '_move_req', '_stop_req',
+        '_move_url', '_move_body', '_wsse_user', '_wsse_password',
+        '_cmd', 'running', 'cv', '_preset_req', '_stop_event',
+        'applied_velocity', 'state_changed',
+        '_retry_count', 'thread',
+    )
+    
     def __init__(self):
         self.ptz: Optional[Any] = None
         self.profile: Optional[str] = None
+        self._session: Optional[requests.Session] = None  # ONVIF 호출용 keep-alive HTTP 세션
+        
+        # 연결 시 한 번 만들어 재사용하는 요청 템플릿 (WSDL 타입 생성/dict 할당 생략)
+        self._goto_req: Optional[Any] = None
+        self._move_req: Optional[Dict[str, Any]] = None
+        self._stop_req: Optional[Dict[str, Any]] = None
         
-        # 현재 명령 속도
-        self.cmd_pan: float = 0.0
-        self.cmd_tilt: float = 0.0
+        # 연속 이동 직접 전송용 (PTZ 서비스 주소, 프로필이 채워진 본문 템플릿)
+        self._move_url: Optional[str] = None
+        self._move_body: bytes = b''
+        self._wsse_user = escape(config.TAPO_USER).encode()
+        self._wsse_password = config.TAPO_PASSWORD.encode()
+        
+        # 현재 명령 (pan, tilt, 버전) - 튜플 참조 교체는 원자적이므로 읽기는 잠금 불필요
+        # 버전은 명령 변경마다 증가 (전송 스레드가 마지막으로 반영한 버전과 비교)
+        self._cmd: Tuple[float, float, int] = (0.0, 0.0, 0)
         
         # 스레드 제어
         self.running = True
-        self.lock = threading.Lock()
+        self.cv = threading.Condition()  # 명령 변경 알림
+        self._preset_req: Optional[str] = None  # 전송 대기 중인 프리셋 이동 요청
+        self._stop_event = threading.Event()  # 종료 시 재연결 대기 즉시 해제
+        
+        # 카메라에 실제로 반영된 (pan, tilt)와 변경 알림 (상태 게시용, 값이 바뀔 때만 set)
+        self.applied_velocity: Tuple[float, float] = (0.0, 0.0)
+        self.state_changed = threading.Event()
+        
+        # 재연결 백오프 (연속 실패 횟수, 성공 시 0으로 초기화)
+        self._retry_count = 0
         
         # 초기 연결
         self._connect()
@@ -40,13 +110,14 @@ class PTZManager:
         self.thread.start()
     
     def _connect(self) -> bool:
-        """ONVIF PTZ 서비스 연결"""
+        """ONVIF PTZ 서비스 연결 (대기 없이 1회 시도, 실패 시 연속 실패 횟수 증가)"""
         try:
             cam = ONVIFCamera(
                 config.TAPO_IP,
                 config.TAPO_ONVIF_PORT,
                 config.TAPO_USER,
-                config.TAPO_PASSWORD
+                config.TAPO_PASSWORD,
+                transport=self._new_transport()
             )
             
             media = cam.create_media_service()
@@ -54,20 +125,123 @@ class PTZManager:
             
             profiles = media.GetProfiles()
             if not profiles:
-                log("❌ PTZ 프로필을 찾을 수 없음")
-                return False
+                raise RuntimeError("PTZ 프로필을 찾을 수 없음")
             
             self.profile = profiles[0].token
-            log("✅ Tapo PTZ 연결 성공")
+            self._build_requests()
+            if self._retry_count > 0:
+                log(f"✅ Tapo PTZ 연결 성공 ({self._retry_count}회 실패 후 복구)")
+            else:
+                log("✅ Tapo PTZ 연결 성공")
+            # 연결되면 실패 횟수 초기화 (대기 중 재연결 후 다음 장애가 긴 백오프로 시작하지 않도록)
+            # (연결 직후 전송이 실패해도 재연결 전에 최소 PTZ_RECONNECT_BASE만큼 대기)
+            self._retry_count = 0
             return True
             
         except Exception as e:
-            log(f"❌ PTZ 연결 실패: {e}")
-            log(f"   {config.PTZ_RECONNECT_DELAY}초 후 재시도...")
             self.ptz = None
             self.profile = None
-            time.sleep(config.PTZ_RECONNECT_DELAY)
+            self._retry_count += 1
+            
+            # 장기 장애 시 로그 폭주 방지 (첫 실패와 N회마다 출력)
+            if self._should_log_failure():
+                log_error("❌ PTZ 연결 실패 (%d회째): %s", self._retry_count, e)
+            return False
+    
+    def _new_transport(self) -> Transport:
+        """
+        keep-alive 세션을 쓰는 zeep 트랜스포트 생성 (연결마다 이전 세션은 닫음)
+        
+        명령 전송 스레드 하나만 쓰므로 커넥션 1개를 계속 재사용해
+        매 명령마다 TCP 연결을 새로 맺지 않습니다. 응답 없는 카메라에 전송 스레드가
+        묶이지 않도록 모든 호출에 (연결, 응답) 타임아웃을 적용합니다.
+        """
+        if self._session is not None:
+            self._session.close()
+        
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+        self._session = session
+        return Transport(
+            session=session,
+            timeout=config.PTZ_READ_TIMEOUT,
+            operation_timeout=(config.PTZ_CONNECT_TIMEOUT, config.PTZ_READ_TIMEOUT)
+        )
+    
+    def _build_requests(self) -> None:
+        """프로필 토큰이 채워진 ONVIF 요청 템플릿 생성 (연결마다 1회)"""
+        goto_req = self.ptz.create_type('GotoPreset')
+        goto_req.ProfileToken = self.profile
+        self._goto_req = goto_req
+        
+        # 연속 이동 요청의 속도 값만 매번 갱신해서 재사용
+        self._move_req = {
+            'ProfileToken': self.profile,
+            'Velocity': {
+                'PanTilt': {'x': 0.0, 'y': 0.0},
+                'Zoom': {'x': 0}
+            }
+        }
+        self._stop_req = {
+            'ProfileToken': self.profile,
+            'PanTilt': True,
+            'Zoom': True
+        }
+        
+        # 연속 이동은 가장 자주 보내는 명령이므로 zeep 직렬화 없이 직접 POST
+        self._move_url = getattr(self.ptz, 'xaddr', None) if config.PTZ_RAW_SOAP else None
+        profile = escape(self.profile).replace('%', '%%')  # 속도 값은 % 포맷으로 채움
+        self._move_body = _MOVE_BODY_TEMPLATE.format(profile=profile).encode()
+    
+    def _wsse_header(self) -> bytes:
+        """요청마다 새 nonce/시각으로 WS-Security UsernameToken(PasswordDigest) 헤더 생성"""
+        nonce = os.urandom(16)
+        created = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()).encode()
+        digest = base64.b64encode(hashlib.sha1(nonce + created + self._wsse_password).digest())
+        return _WSSE_TEMPLATE % (self._wsse_user, digest, base64.b64encode(nonce), created)
+    
+    def _send_move_raw(self, pan: float, tilt: float) -> bool:
+        """
+        미리 만든 SOAP 본문으로 연속 이동 명령 직접 전송
+        
+        Returns:
+            전송 성공 여부 (카메라가 4xx/5xx로 거부하면 False, 이후 이 연결에서는 zeep 사용)
+        """
+        envelope = _SOAP_HEAD + self._wsse_header() + self._move_body % (pan, tilt)
+        # 타임아웃 등 전송 예외는 호출부로 전파되어 재연결 처리
+        resp = self._session.post(
+            self._move_url, data=envelope, headers=_SOAP_HEADERS,
+            timeout=(config.PTZ_CONNECT_TIMEOUT, config.PTZ_READ_TIMEOUT)
+        )
+        if resp.status_code >= 400:
+            log_warning("⚠️ PTZ 직접 전송 거부 (HTTP %d), zeep 전송으로 전환", resp.status_code)
+            self._move_url = None
             return False
+        return True
+    
+    def _next_backoff(self) -> float:
+        """
+        연속 실패 횟수에 따른 재시도 대기 시간 계산 (지수 백오프 + ±20% 지터)
+        
+        BASE, 2*BASE, 4*BASE, ... 최대 MAX까지 증가
+        """
+        exponent = min(max(self._retry_count - 1, 0), 30)  # 2 ** n 오버플로 방지
+        delay = min(config.PTZ_RECONNECT_MAX, config.PTZ_RECONNECT_BASE * (2 ** exponent))
+        return delay * random.uniform(0.8, 1.2)
+    
+    def _should_log_failure(self) -> bool:
+        """첫 실패와 N회째 실패마다만 로그 출력"""
+        return (self._retry_count - 1) % config.PTZ_RECONNECT_LOG_EVERY == 0
+    
+    def _backoff_wait(self) -> None:
+        """재연결 전 백오프 대기 (종료 시 즉시 해제)"""
+        delay = self._next_backoff()
+        if self._should_log_failure():
+            log("   %.1f초 후 재시도...", delay)
+        self._stop_event.wait(delay)
     
     def set_velocity(self, pan: float, tilt: float) -> None:
         """
@@ -77,9 +251,24 @@ class PTZManager:
             pan: 수평 회전 속도 (-1.0 ~ 1.0)
             tilt: 수직 회전 속도 (-1.0 ~ 1.0)
         """
-        with self.lock:
-            self.cmd_pan = max(-1.0, min(1.0, pan))
-            self.cmd_tilt = max(-1.0, min(1.0, tilt))
+        # 카메라 속도 분해능 단위로 양자화 (미세한 흔들림은 같은 명령으로 합쳐짐)
+        pan = self._quantize(max(-1.0, min(1.0, pan)))
+        tilt = self._quantize(max(-1.0, min(1.0, tilt)))
+        # 양자화 후 값이 같으면 잠금/알림 없이 반환 (매 프레임 같은 속도/stop() 호출이 대부분)
+        # 미세한 흔들림은 양자화에서 이미 합쳐지고, 한 단계 이상의 변화는 항상 반영
+        cmd = self._cmd
+        if pan == cmd[0] and tilt == cmd[1]:
+            return
+        
+        with self.cv:
+            self._cmd = (pan, tilt, self._cmd[2] + 1)
+            self.cv.notify()
+    
+    @staticmethod
+    def _quantize(value: float) -> float:
+        """PTZ_VELOCITY_QUANTUM 단위로 반올림 (부동소수 잡음 제거를 위해 소수 6자리로 정리)"""
+        quantum = config.PTZ_VELOCITY_QUANTUM
+        return round(round(value / quantum) * quantum, 6)
     
     def stop(self) -> None:
         """PTZ 정지"""
@@ -87,96 +276,151 @@ class PTZManager:
     
     def goto_preset(self, preset_token: str) -> bool:
         """
-        프리셋 위치로 이동
+        프리셋 위치로 이동 요청
+        
+        SOAP 호출은 전송 스레드에서 수행하므로 추적 루프를 막지 않습니다.
         
         Args:
             preset_token: 프리셋 토큰 번호
             
         Returns:
-            성공 여부
+            요청 접수 여부 (미연결 시 False)
         """
         if not self.ptz or not self.profile:
             log("⚠️ PTZ 미연결 상태에서 프리셋 이동 시도")
             return False
         
+        with self.cv:
+            # 프리셋 이동 시 속도 명령 초기화 (프리셋 요청과 함께 한 번에 반영)
+            self._preset_req = str(preset_token)
+            self._cmd = (0.0, 0.0, self._cmd[2] + 1)
+            self.cv.notify()
+        return True
+    
+    def _send_preset(self, preset_token: str) -> None:
+        """프리셋 이동 명령 전송 (전송 스레드)"""
         try:
-            req = self.ptz.create_type('GotoPreset')
-            req.ProfileToken = self.profile
-            req.PresetToken = str(preset_token)
+            req = self._goto_req
+            req.PresetToken = preset_token
             self.ptz.GotoPreset(req)
-            
-            # 프리셋 이동 시 속도 명령 초기화
-            with self.lock:
-                self.cmd_pan = 0
-                self.cmd_tilt = 0
-            
             log(f"🔭 프리셋 {preset_token}번으로 이동")
-            return True
-            
         except Exception as e:
-            log(f"⚠️ 프리셋 이동 실패: {e}")
-            return False
+            log_warning("⚠️ 프리셋 이동 실패: %s", e)
     
     def _command_loop(self) -> None:
         """PTZ 명령 전송 루프 (백그라운드 스레드)"""
         last_pan: float = 0.0
         last_tilt: float = 0.0
+        # 카메라에 실제로 반영된 명령 버전 (전송 실패 시 갱신하지 않아 재연결 후 다시 처리)
+        applied_version = 0
+        
+        # 반복마다 쓰는 값은 지역 변수로 한 번만 조회 (설정은 불변)
+        cv = self.cv
+        wait = cv.wait
+        keepalive_interval = config.PTZ_KEEPALIVE_INTERVAL
         
         while self.running:
-            # PTZ 연결 확인
+            # 미연결 시: 직전 실패(연결/전송)가 있으면 백오프 대기 후 재연결,
+            # 성공하면 카메라가 안정될 때까지 잠시 기다린 뒤 명령 전송
             if not self.ptz or not self.profile:
-                self._connect()
+                if self._retry_count > 0:
+                    self._backoff_wait()
+                    if not self.running:
+                        break
+                if self._connect():
+                    self._stop_event.wait(config.PTZ_RECONNECT_SETTLE)
                 continue
             
-            # 현재 명령 속도 읽기
-            with self.lock:
-                current_pan = self.cmd_pan
-                current_tilt = self.cmd_tilt
+            # 반영하지 못한 명령이 없을 때만 대기 (정지 중에는 무기한, 이동 중에는 keepalive 주기)
+            with cv:
+                keepalive = False
+                if self._cmd[2] == applied_version and self.running:
+                    moving = last_pan != 0 or last_tilt != 0
+                    timeout = keepalive_interval if moving else None
+                    keepalive = not wait(timeout) and moving
+                current_pan, current_tilt, version = self._cmd
+                preset = self._preset_req
+                self._preset_req = None
+            
+            if not self.running:
+                break
             
-            # 속도 변경 감지
-            pan_changed = abs(current_pan - last_pan) > config.PTZ_VELOCITY_THRESHOLD
-            tilt_changed = abs(current_tilt - last_tilt) > config.PTZ_VELOCITY_THRESHOLD
-            stopped = current_pan == 0 and current_tilt == 0 and last_pan != 0
+            # 프리셋 이동 (카메라가 스스로 멈추므로 정지 명령은 보내지 않음)
+            if preset is not None:
+                self._send_preset(preset)
+                last_pan = 0.0
+                last_tilt = 0.0
+                self._publish_velocity(0.0, 0.0)
             
-            if pan_changed or tilt_changed or stopped:
+            # 속도 변경 감지 (명령은 이미 양자화되어 있으므로 값 비교만으로 충분)
+            changed = current_pan != last_pan or current_tilt != last_tilt
+            
+            if changed or keepalive:
                 try:
                     if current_pan == 0 and current_tilt == 0:
                         # 정지 명령
-                        self.ptz.Stop({
-                            'ProfileToken': self.profile,
-                            'PanTilt': True,
-                            'Zoom': True
-                        })
+                        self.ptz.Stop(self._stop_req)
                     else:
-                        # 연속 이동 명령
-                        req = {
-                            'ProfileToken': self.profile,
-                            'Velocity': {
-                                'PanTilt': {'x': current_pan, 'y': current_tilt},
-                                'Zoom': {'x': 0}
-                            }
-                        }
-                        self.ptz.ContinuousMove(req)
+                        # 연속 이동 명령 (keepalive 시 같은 속도 재전송)
+                        if self._move_url is None or not self._send_move_raw(current_pan, current_tilt):
+                            # 템플릿의 속도만 갱신해서 zeep으로 전송
+                            pan_tilt = self._move_req['Velocity']['PanTilt']
+                            pan_tilt['x'] = current_pan
+                            pan_tilt['y'] = current_tilt
+                            self.ptz.ContinuousMove(self._move_req)
                     
                     last_pan = current_pan
                     last_tilt = current_tilt
+                    self._publish_velocity(current_pan, current_tilt)
                     
                 except Exception as e:
-                    log(f"⚠️ PTZ 명령 전송 실패: {e}")
-                    self.ptz = None  # 재연결 트리거
+                    log_warning("⚠️ PTZ 명령 전송 실패: %s", e)
+                    self.ptz = None  # 재연결 트리거 (백오프 후 재연결)
+                    self._retry_count += 1
+                    continue  # applied_version 유지 → 재연결 후 최신 명령 재전송
             
-            time.sleep(config.PTZ_LOOP_INTERVAL)
+            # 전송 중에 새 명령이 들어왔으면 버전이 달라져 다음 반복에서 대기 없이 처리
+            applied_version = version
+        
+        # 이동 중에 종료되면 카메라가 계속 움직이지 않도록 정지 명령 전송
+        if (last_pan != 0 or last_tilt != 0) and self.ptz and self.profile:
+            try:
+                self.ptz.Stop(self._stop_req)
+                self._publish_velocity(0.0, 0.0)
+            except Exception:
+                pass  # shutdown()에서 한 번 더 정지 시도
+    
+    def _publish_velocity(self, pan: float, tilt: float) -> None:
+        """반영된 속도가 바뀌었을 때만 갱신하고 state_changed 알림 (keepalive 재전송은 무시)"""
+        velocity = (pan, tilt)
+        if velocity != self.applied_velocity:
+            self.applied_velocity = velocity
+            self.state_changed.set()
     
     def shutdown(self) -> None:
         """PTZ 매니저 종료"""
         log("🛑 PTZ 매니저 종료 중...")
-        self.running = False
-        self.stop()
+        # 종료 플래그와 정지 명령을 한 번에 반영하고 대기 중인 전송 스레드를 즉시 깨움
+        with self.cv:
+            self.running = False
+            self._cmd = (0.0, 0.0, self._cmd[2] + 1)
+            self.cv.notify_all()
+        self._stop_event.set()  # 재연결 백오프 대기 해제
         
-        # 스레드 종료 대기
+        # 스레드 종료 대기 (스레드는 이동 중이었으면 마지막에 정지 명령 전송)
         if self.thread.is_alive():
             self.thread.join(timeout=2.0)
         
+        # 스레드의 정지 명령이 실패했거나 스레드가 전송 중에 멈춰 있으면 직접 정지
+        if (self.thread.is_alive() or self.applied_velocity != (0.0, 0.0)) and self.is_connected:
+            try:
+                self.ptz.Stop(self._stop_req)
+            except Exception as e:
+                log_warning("⚠️ 종료 시 PTZ 정지 실패: %s", e)
+        
+        if self._session is not None:
+            self._session.close()
+        
         log("🛑 PTZ 매니저 종료됨")
     
     @property
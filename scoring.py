@@ -0,0 +1,85 @@
+"""
+스코어링 커널 모듈
+타겟 후보 박스의 가중 점수 계산 (Numba 설치 시 네이티브 코드로 JIT 컴파일)
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba 미설치 환경에서는 NumPy 벡터 연산 사용
+    njit = None
+
+
+def _box_scores_numpy(
+    xyxy: np.ndarray,
+    confs: np.ndarray,
+    mask: np.ndarray,
+    cx: float,
+    cy: float,
+    inv_half_w: float,
+    inv_half_h: float,
+    conf_weight: float,
+    dist_weight: float
+) -> np.ndarray:
+    """NumPy 벡터 연산 버전 (Numba 미설치 시 사용)"""
+    bx_cx = (xyxy[:, 0] + xyxy[:, 2]) * 0.5
+    bx_cy = (xyxy[:, 1] + xyxy[:, 3]) * 0.5
+    dist_factor = (
+        np.abs(bx_cx - cx) * inv_half_w +
+        np.abs(bx_cy - cy) * inv_half_h
+    ) * 0.5
+    
+    scores = confs * conf_weight + (1.0 - dist_factor) * dist_weight
+    return np.where(mask, scores, -np.inf)
+
+
+def _box_scores_loop(
+    xyxy: np.ndarray,
+    confs: np.ndarray,
+    mask: np.ndarray,
+    cx: float,
+    cy: float,
+    inv_half_w: float,
+    inv_half_h: float,
+    conf_weight: float,
+    dist_weight: float
+) -> np.ndarray:
+    """스칼라 루프 버전 (Numba JIT 컴파일 대상)"""
+    scores = np.full(xyxy.shape[0], -np.inf)
+    
+    for i in range(xyxy.shape[0]):
+        if not mask[i]:
+            continue
+        
+        bx_cx = (xyxy[i, 0] + xyxy[i, 2]) * 0.5
+        bx_cy = (xyxy[i, 1] + xyxy[i, 3]) * 0.5
+        dist_factor = (abs(bx_cx - cx) * inv_half_w + abs(bx_cy - cy) * inv_half_h) * 0.5
+        scores[i] = confs[i] * conf_weight + (1.0 - dist_factor) * dist_weight
+    
+    return scores
+
+
+# box_scores(xyxy, confs, mask, cx, cy, inv_half_w, inv_half_h, conf_weight, dist_weight)
+#   마스크된 박스별 가중 점수 배열 반환 (마스크 밖은 -inf)
+#   점수 = 신뢰도 * conf_weight + (1 - 중심 거리) * dist_weight
+#   클래스별 최적 박스처럼 여러 번 선택할 때 점수는 한 번만 계산하고 argmax로 선택
+#
+# fastmath는 -inf(마스크 밖 점수)를 깨지 않도록 nnan/ninf를 제외한 플래그만 사용
+_FASTMATH_FLAGS = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+if njit is not None:
+    box_scores = njit(cache=True, fastmath=_FASTMATH_FLAGS)(_box_scores_loop)
+else:
+    box_scores = _box_scores_numpy
+
+
+def warmup_kernel() -> None:
+    """
+    스코어링 커널 사전 컴파일
+    
+    Numba는 첫 호출 시 컴파일하므로, 모델 로드 시점에 실제 추론 결과와 같은
+    dtype/레이아웃(boxes.data의 float32 열 슬라이스)으로 한 번 호출해 둡니다.
+    """
+    data = np.zeros((1, 6), dtype=np.float32)
+    mask = np.ones(1, dtype=np.bool_)
+    box_scores(data[:, :4], data[:, 4], mask, 0.5, 0.5, 1.0, 1.0, 0.5, 0.5)
@@ -2,20 +2,28 @@
 상태 관리 모듈
 TrackerState dataclass로 전역 상태를 캡슐화
 """
-import time
 from dataclasses import dataclass, field
+from time import monotonic as _now
 from typing import Optional, List
 
+# 모든 시각은 monotonic 기준 (시스템 시계 변경/NTP 보정에 영향 없음, 경과 시간 비교 전용)
+# "아직 없음"을 뜻하는 시각: 어떤 경과 시간 비교에서도 충분히 오래 전으로 판정
+_NEVER = float('-inf')
 
-@dataclass
+
+@dataclass(slots=True)
 class TrackerState:
-    """정후 트래커 상태 클래스"""
+    """
+    정후 트래커 상태 클래스
+    
+    매 프레임 접근하므로 __dict__ 대신 슬롯에 저장 (필드 외 속성 추가 불가)
+    """
     
     # --- 오디오/수색 관련 ---
-    last_audio_time: float = 0.0
+    last_audio_time: float = _NEVER
     is_searching: bool = False
     current_preset_idx: int = 0
-    last_scan_move_time: float = 0.0
+    last_scan_move_time: float = _NEVER
     
     # --- 추적 관련 ---
     target_locked: bool = False
@@ -23,26 +31,26 @@ class TrackerState:
     
     # --- Frigate 연동 (사람 감지) ---
     person_detected_count: int = 0  # Frigate에서 감지한 사람 수
-    last_person_update_time: float = 0.0  # 마지막 person MQTT 수신 시각
+    last_person_update_time: float = _NEVER  # 마지막 person MQTT 수신 시각
     
     # --- 디버그/로깅 관련 ---
-    last_debug_time: float = 0.0
-    last_status_log_time: float = 0.0
+    last_debug_time: float = _NEVER
+    last_status_log_time: float = _NEVER
     
     # --- 시스템 ---
-    startup_time: float = field(default_factory=time.time)
+    startup_time: float = field(default_factory=_now)
     
     # --- 슬립 모드 (프라이버시 모드) ---
     is_sleep_mode: bool = False
     sleep_mode_start_time: float = 0.0
-    last_sleep_check_time: float = 0.0
+    last_sleep_check_time: float = _NEVER
     normal_frame_count: int = 0  # 연속 정상 프레임 카운트
     
     def start_searching(self) -> None:
         """수색 모드 시작"""
-        self.last_audio_time = time.time()
+        self.last_audio_time = _now()
         self.is_searching = True
-        self.last_scan_move_time = 0.0  # 즉시 프리셋 이동 트리거
+        self.last_scan_move_time = _NEVER  # 즉시 프리셋 이동 트리거
     
     def stop_searching(self) -> None:
         """수색 모드 종료"""
@@ -70,6 +78,9 @@ class TrackerState:
     # --- 오인식 방지 (Fallback) 정보 ---
     fallback_start_time: float = 0.0  # 대체 추적 시작 시간
     last_target_center: Optional[tuple[float, float]] = None  # 마지막 정후 위치 (정규화 좌표)
+    
+    # --- ROI 추론 ---
+    roi_frame_count: int = 0  # 마지막 전체 프레임 추론 이후 연속 ROI 추론 횟수
 
     def increment_loss_count(self) -> int:
         """놓침 카운트 증가 및 반환"""
@@ -84,73 +95,115 @@ class TrackerState:
         """유예 횟수 초과 여부 확인"""
         return self.loss_count >= limit
 
-    def start_fallback_timer(self) -> None:
+    def start_fallback_timer(self, now: Optional[float] = None) -> None:
         """대체 추적 타이머 시작 (이미 돌고 있으면 유지)"""
         if self.fallback_start_time == 0.0:
-            self.fallback_start_time = time.time()
+            self.fallback_start_time = _now() if now is None else now
             
     def reset_fallback_timer(self) -> None:
         """대체 추적 타이머 초기화"""
         self.fallback_start_time = 0.0
         
-    def is_fallback_timeout(self, limit: float) -> bool:
+    def is_fallback_timeout(self, limit: float, now: Optional[float] = None) -> bool:
         """대체 추적 시간 초과 확인"""
         if self.fallback_start_time == 0.0:
             return False
-        return time.time() - self.fallback_start_time > limit
+        if now is None:
+            now = _now()
+        return now - self.fallback_start_time > limit
         
     def update_last_target_pos(self, center: tuple[float, float]) -> None:
         """마지막 정후 위치 업데이트 (Fallback 거리 계산용)"""
         self.last_target_center = center
     
-    def next_preset(self, preset_count: int) -> int:
+    def can_use_roi(self, full_frame_interval: int) -> bool:
+        """ROI 추론 가능 여부 (정후 추적 중이고 전체 프레임 추론 주기 전)"""
+        return (
+            self.target_locked
+            and self.last_target_center is not None
+            and self.roi_frame_count < full_frame_interval
+        )
+    
+    def mark_roi_inference(self) -> None:
+        """ROI 추론 성공 기록"""
+        self.roi_frame_count += 1
+    
+    def reset_roi_count(self) -> None:
+        """전체 프레임 추론 시 ROI 카운트 초기화"""
+        self.roi_frame_count = 0
+    
+    def next_preset(self, preset_count: int, now: Optional[float] = None) -> int:
         """다음 프리셋 인덱스 반환 및 업데이트"""
+        if now is None:
+            now = _now()
         idx = self.current_preset_idx % preset_count
         self.current_preset_idx += 1
-        self.last_scan_move_time = time.time()
+        self.last_scan_move_time = now
         return idx
     
-    def should_move_preset(self, scan_interval: float) -> bool:
+    def should_move_preset(self, scan_interval: float, now: Optional[float] = None) -> bool:
         """프리셋 이동 시간이 되었는지 확인"""
-        return time.time() - self.last_scan_move_time > scan_interval
+        if now is None:
+            now = _now()
+        return now - self.last_scan_move_time > scan_interval
     
-    def is_search_timeout(self, trigger_time: float) -> bool:
+    def is_search_timeout(self, trigger_time: float, now: Optional[float] = None) -> bool:
         """수색 시간이 종료되었는지 확인"""
-        return time.time() - self.last_audio_time > trigger_time
+        if now is None:
+            now = _now()
+        return now - self.last_audio_time > trigger_time
     
-    def get_search_remaining_time(self, trigger_time: float) -> int:
-        """수색 남은 시간 (초) 반환"""
-        return int(trigger_time - (time.time() - self.last_audio_time))
+    def get_search_remaining_time(self, trigger_time: float, now: Optional[float] = None) -> int:
+        """수색 남은 시간 (초) 반환 (수색 시작 전이면 0)"""
+        if self.last_audio_time == _NEVER:
+            return 0
+        if now is None:
+            now = _now()
+        return int(trigger_time - (now - self.last_audio_time))
     
-    def get_scan_remaining_time(self, scan_interval: float) -> int:
-        """다음 프리셋 이동까지 남은 시간 (초) 반환"""
-        return int(scan_interval - (time.time() - self.last_scan_move_time))
+    def get_scan_remaining_time(self, scan_interval: float, now: Optional[float] = None) -> int:
+        """다음 프리셋 이동까지 남은 시간 (초) 반환 (이동 기록이 없으면 즉시 이동이므로 0)"""
+        if self.last_scan_move_time == _NEVER:
+            return 0
+        if now is None:
+            now = _now()
+        return int(scan_interval - (now - self.last_scan_move_time))
     
-    def can_save_debug(self, save_interval: float) -> bool:
+    def can_save_debug(self, save_interval: float, now: Optional[float] = None) -> bool:
         """디버그 이미지 저장 가능 여부"""
-        return time.time() - self.last_debug_time >= save_interval
+        if now is None:
+            now = _now()
+        return now - self.last_debug_time >= save_interval
     
-    def mark_debug_saved(self) -> None:
+    def mark_debug_saved(self, now: Optional[float] = None) -> None:
         """디버그 이미지 저장 시간 갱신"""
-        self.last_debug_time = time.time()
+        if now is None:
+            now = _now()
+        self.last_debug_time = now
     
-    def can_log_status(self, log_interval: float) -> bool:
+    def can_log_status(self, log_interval: float, now: Optional[float] = None) -> bool:
         """상태 로그 출력 가능 여부"""
-        return time.time() - self.last_status_log_time >= log_interval
+        if now is None:
+            now = _now()
+        return now - self.last_status_log_time >= log_interval
     
-    def mark_status_logged(self) -> None:
+    def mark_status_logged(self, now: Optional[float] = None) -> None:
         """상태 로그 출력 시간 갱신"""
-        self.last_status_log_time = time.time()
+        if now is None:
+            now = _now()
+        self.last_status_log_time = now
     
-    def is_startup_period(self, ignore_time: float) -> bool:
+    def is_startup_period(self, ignore_time: float, now: Optional[float] = None) -> bool:
         """시작 직후 무시 구간인지 확인"""
-        return time.time() - self.startup_time < ignore_time
+        if now is None:
+            now = _now()
+        return now - self.startup_time < ignore_time
     
     # --- 슬립 모드 메서드 ---
-    def enter_sleep_mode(self) -> None:
+    def enter_sleep_mode(self, now: Optional[float] = None) -> None:
         """슬립 모드 진입 (프라이버시 모드 감지)"""
         self.is_sleep_mode = True
-        self.sleep_mode_start_time = time.time()
+        self.sleep_mode_start_time = _now() if now is None else now
         self.normal_frame_count = 0
         # 다른 상태 초기화
         self.target_locked = False
@@ -162,13 +215,15 @@ class TrackerState:
         self.is_sleep_mode = False
         self.normal_frame_count = 0
     
-    def can_check_sleep(self, check_interval: float) -> bool:
+    def can_check_sleep(self, check_interval: float, now: Optional[float] = None) -> bool:
         """슬립 모드 체크 시간이 되었는지 확인"""
-        return time.time() - self.last_sleep_check_time >= check_interval
+        if now is None:
+            now = _now()
+        return now - self.last_sleep_check_time >= check_interval
     
-    def mark_sleep_checked(self) -> None:
+    def mark_sleep_checked(self, now: Optional[float] = None) -> None:
         """슬립 모드 체크 시간 갱신"""
-        self.last_sleep_check_time = time.time()
+        self.last_sleep_check_time = _now() if now is None else now
     
     def increment_normal_count(self) -> int:
         """정상 프레임 카운트 증가 및 반환"""
@@ -179,48 +234,59 @@ class TrackerState:
         """정상 프레임 카운트 초기화"""
         self.normal_frame_count = 0
     
-    def get_sleep_duration(self) -> int:
+    def get_sleep_duration(self, now: Optional[float] = None) -> int:
         """슬립 모드 지속 시간 (초) 반환"""
         if not self.is_sleep_mode:
             return 0
-        return int(time.time() - self.sleep_mode_start_time)
+        if now is None:
+            now = _now()
+        return int(now - self.sleep_mode_start_time)
     
     # --- 사람 감지 메서드 (Frigate 연동) ---
     def update_person_count(self, count: int) -> None:
         """Frigate에서 감지한 사람 수 업데이트"""
         self.person_detected_count = count
-        self.last_person_update_time = time.time()
+        self.last_person_update_time = _now()
     
-    def is_person_present(self, timeout: float = 30.0) -> bool:
+    def is_person_present(self, timeout: float = 30.0, now: Optional[float] = None) -> bool:
         """
         사람이 있는지 확인
         
         Args:
             timeout: person MQTT 미수신 시 타임아웃 (초)
+            now: 현재 시각 (None이면 직접 읽음)
             
         Returns:
             사람이 있으면 True
         """
+        if now is None:
+            now = _now()
+        
         # person MQTT가 오래 안 온 경우 (Frigate 문제 가능성)
         # 이 경우 안전하게 사람이 있다고 가정
-        if time.time() - self.last_person_update_time > timeout:
+        if now - self.last_person_update_time > timeout:
             return True
         
         return self.person_detected_count > 0
     
-    def is_idle_mode(self, timeout: float = 30.0) -> bool:
+    def is_idle_mode(self, timeout: float = 30.0, now: Optional[float] = None) -> bool:
         """
         대기 모드 여부 확인 (사람 없음 + 수색 모드 아님)
         
         Args:
             timeout: person MQTT 타임아웃
+            now: 현재 시각 (None이면 직접 읽음)
             
         Returns:
             대기 모드면 True
         """
-        return (
-            not self.is_person_present(timeout) and
-            not self.is_searching and
-            not self.target_locked and
-            not self.is_sleep_mode
-        )
+        # 플래그 확인을 먼저 (추적/수색 중에는 시각을 읽지 않음)
+        if self.is_sleep_mode or self.is_searching or self.target_locked:
+            return False
+        
+        # is_person_present()를 펼친 것: 사람이 있거나 person MQTT 타임아웃이면 대기 아님
+        if self.person_detected_count > 0:
+            return False
+        if now is None:
+            now = _now()
+        return now - self.last_person_update_time <= timeout
@@ -1,11 +1,85 @@
 """
 유틸리티 모듈
 로깅, 헬퍼 함수 등
+
+로그 함수는 %-스타일 인자를 받으며, 해당 레벨이 꺼져 있으면 문자열 포맷을 하지 않습니다.
+(프레임 단위 경로에서는 f-string 대신 log_debug("... %s", value) 형태로 사용)
 """
-from datetime import datetime
+import logging
+import sys
+import time
+
+from config import config
+
+
+class _StdoutBytesHandler(logging.Handler):
+    """
+    표준출력 바이트 버퍼에 직접 쓰는 로그 핸들러
+    
+    "[HH:MM:SS] " 접두어는 초가 바뀔 때만 UTF-8 바이트로 다시 만들고,
+    메시지만 인코딩해서 TextIOWrapper를 거치지 않고 한 번에 씁니다.
+    (emit은 핸들러 잠금 안에서 호출되므로 스레드 간 줄이 섞이지 않음)
+    """
+    
+    def __init__(self, buffer):
+        super().__init__()
+        self._buffer = buffer
+        self._prefix_sec = -1
+        self._prefix = b''
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            sec = int(record.created)
+            if sec != self._prefix_sec:
+                self._prefix_sec = sec
+                self._prefix = time.strftime('[%H:%M:%S] ', time.localtime(sec)).encode()
+            
+            self._buffer.write(self._prefix + record.getMessage().encode('utf-8') + b'\n')
+            self._buffer.flush()
+        except Exception:
+            self.handleError(record)
+
+
+def _create_logger() -> logging.Logger:
+    """트래커 로거 생성 (모듈 로드 시 1회, 핸들러가 출력 단위 잠금 처리)"""
+    logger = logging.getLogger('jeonghoo')
+    if not logger.handlers:
+        buffer = getattr(sys.stdout, 'buffer', None)
+        if buffer is not None:
+            handler = _StdoutBytesHandler(buffer)
+        else:
+            # 바이트 버퍼가 없는 stdout (교체된 스트림 등)은 일반 핸들러 사용
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', datefmt='%H:%M:%S'))
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            logger.setLevel(config.LOG_LEVEL.upper())
+        except ValueError:
+            # 잘못된 LOG_LEVEL 값으로 트래커가 시작 못 하는 일이 없도록 INFO로 대체
+            logger.setLevel(logging.INFO)
+            logger.warning("⚠️ 알 수 없는 LOG_LEVEL '%s', INFO로 설정", config.LOG_LEVEL)
+    return logger
+
+
+logger = _create_logger()
+
+
+def log(msg: str, *args) -> None:
+    """타임스탬프 포함 로그 출력 (INFO)"""
+    logger.info(msg, *args)
+
+
+def log_debug(msg: str, *args) -> None:
+    """디버그 로그 (LOG_LEVEL=DEBUG일 때만 포맷/출력)"""
+    logger.debug(msg, *args)
+
+
+def log_warning(msg: str, *args) -> None:
+    """경고 로그"""
+    logger.warning(msg, *args)
 
 
-def log(msg: str) -> None:
-    """타임스탬프 포함 로그 출력"""
-    timestamp = datetime.now().strftime('%H:%M:%S')
-    print(f"[{timestamp}] {msg}")
+def log_error(msg: str, *args) -> None:
+    """오류 로그"""
+    logger.error(msg, *args)